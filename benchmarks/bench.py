@@ -0,0 +1,171 @@
+"""
+Offline micro benchmarks for libsimba_utils.
+
+Run from the repository root:
+
+    python -m benchmarks.bench --output bench.json
+
+Each case is timed per operation after a warm up, and ops/sec plus latency
+percentiles are reported as JSON so results can be compared between releases.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+
+PRIVATE_KEY = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+LEGACY_PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+    "nonce": "0x2",
+}
+EIP1559_PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "maxPriorityFeePerGas": "0x3b9aca00",
+    "maxFeePerGas": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+    "nonce": "0x3",
+}
+TEXT = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut lab"
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(
+    func: Callable[[], object], iterations: int, warmup: int
+) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    timings = []
+    perf_counter = time.perf_counter
+    for _ in range(iterations):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    timings.sort()
+    total = sum(timings)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else float("inf"),
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "min_us": timings[0] * 1e6,
+        "p50_us": percentile(timings, 0.50) * 1e6,
+        "p90_us": percentile(timings, 0.90) * 1e6,
+        "p99_us": percentile(timings, 0.99) * 1e6,
+        "max_us": timings[-1] * 1e6,
+    }
+
+
+def cases() -> Dict[str, Callable[[], object]]:
+    from libsimba_utils.utils import (
+        convert_bytes32_to_string,
+        convert_to_bytes32_array,
+        keccak_hash,
+        string_to_uint256,
+    )
+    from libsimba_utils.wallet import Wallet
+
+    wallet = Wallet()
+    wallet.generate_from_private_key(PRIVATE_KEY)
+
+    benchmarks = {
+        "sign_transaction.legacy": lambda: wallet.sign_transaction(LEGACY_PAYLOAD),
+        "sign_transaction.eip1559": lambda: wallet.sign_transaction(EIP1559_PAYLOAD),
+        "generate_from_mnemonic": lambda: Wallet().generate_from_mnemonic(MNEMONIC),
+        "generate_from_private_key": lambda: Wallet().generate_from_private_key(
+            PRIVATE_KEY
+        ),
+    }
+    for length in (1, 4, 16):
+        text = (TEXT * length)[: 32 * length]
+        encoded = convert_to_bytes32_array(text, length)
+        benchmarks[
+            f"convert_to_bytes32_array.{length}"
+        ] = lambda text=text, length=length: convert_to_bytes32_array(text, length)
+        benchmarks[
+            f"convert_bytes32_to_string.{length}"
+        ] = lambda encoded=encoded: convert_bytes32_to_string(encoded)
+    for size in (16, 1024):
+        text = (TEXT * size)[:size]
+        benchmarks[f"keccak_hash.{size}"] = lambda text=text: keccak_hash(text)
+        benchmarks[f"string_to_uint256.{size}"] = lambda text=text: string_to_uint256(
+            text
+        )
+    return benchmarks
+
+
+def environment() -> Dict[str, str]:
+    from libsimba_utils import keccak
+
+    try:
+        from importlib.metadata import version
+
+        package_version = version("libsimba-utils")
+    except Exception:
+        package_version = "unknown"
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "package_version": package_version,
+        "keccak_backend": keccak.get_backend(),
+    }
+
+
+def run(
+    iterations: int = 200, warmup: int = 10, only: Optional[str] = None
+) -> Dict[str, object]:
+    results = {}
+    for name, func in cases().items():
+        if only and only not in name:
+            continue
+        # deriving from a mnemonic is orders of magnitude slower than the other cases
+        count = max(1, iterations // 10) if name.startswith("generate_") else iterations
+        results[name] = measure(func, count, min(warmup, count))
+    return {"environment": environment(), "results": results}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--iterations", type=int, default=200, help="timed operations per case"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=10, help="untimed operations per case"
+    )
+    parser.add_argument("--only", help="only run cases whose name contains this string")
+    parser.add_argument(
+        "--output", help="write the JSON report to this file instead of stdout"
+    )
+    args = parser.parse_args(argv)
+
+    report = run(args.iterations, args.warmup, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
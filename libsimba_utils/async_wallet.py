@@ -0,0 +1,347 @@
+import asyncio
+import time
+
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Sequence, Union
+
+from libsimba_utils.exceptions import (
+    SimbaKeystoreException,
+    SimbaMessageException,
+    SimbaTransactionException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.instrumentation import MetricsSink
+from libsimba_utils.keystore import (
+    Keystore,
+    UnlockCache,
+    decrypt_keystore,
+    load_keystore,
+)
+from libsimba_utils.messages import Message
+from libsimba_utils.nonce import NonceManager
+from libsimba_utils.transaction import (
+    OUTPUT_DICT,
+    SignedTransaction,
+    check_output,
+    with_nonce,
+)
+from libsimba_utils.wallet import (
+    Wallet,
+    _sign_message,
+    _sign_message_or_error,
+    _sign_payload,
+    _sign_payload_or_error,
+    _sign_payload_timed,
+)
+from libsimba_utils.wallet_base import WalletBase
+
+
+class AsyncWallet(WalletBase):
+    """
+    Wallet for asyncio applications. Key generation and signing run in an executor,
+    so they do not block the event loop.
+    """
+
+    def __init__(
+        self,
+        executor: Executor = None,
+        max_concurrency: int = None,
+        nonce_manager: NonceManager = None,
+        keystore: Keystore = None,
+        unlock_cache: Optional[UnlockCache] = None,
+    ):
+        """
+        Args:
+            executor: the executor to run key generation and signing in. If not set, the
+                      event loop's default executor is used. A ProcessPoolExecutor spreads
+                      signing across cores.
+            max_concurrency: the maximum number of operations submitted to the executor
+                             at once. If not set, there is no limit.
+            nonce_manager: if set, payloads signed without a nonce are given one from the manager.
+            keystore: an encrypted JSON keystore for unlock_wallet.
+            unlock_cache: caches recently unlocked keystores, as for Wallet. Not set by default.
+        """
+        self._wallet = Wallet(
+            nonce_manager=nonce_manager, keystore=keystore, unlock_cache=unlock_cache
+        )
+        super().__init__()
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def wallet(self):
+        return self._wallet.wallet
+
+    @wallet.setter
+    def wallet(self, wallet):
+        self._wallet.wallet = wallet
+
+    @property
+    def nonce_manager(self) -> Optional[NonceManager]:
+        return self._wallet.nonce_manager
+
+    @property
+    def keystore(self) -> Optional[Keystore]:
+        return self._wallet.keystore
+
+    @keystore.setter
+    def keystore(self, keystore: Optional[Keystore]):
+        self._wallet.keystore = keystore
+
+    async def _run(self, func: Callable, *args):
+        """
+        Run a function in the executor, waiting for a slot if concurrency is bounded
+
+        Args:
+            func: the function to run. It must be picklable if the executor is a process pool.
+            args: the arguments to the function
+        Returns:
+            Returns the result of the function
+        """
+        loop = asyncio.get_running_loop()
+        if self.max_concurrency is None:
+            return await loop.run_in_executor(self.executor, func, *args)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def unlock_wallet(self, passkey: str, keystore: Keystore = None):
+        """
+        Unlock the wallet with the given passkey. The keystore KDF runs in the executor
+        unless the keystore was unlocked recently.
+
+        Args:
+            passkey: used to unlock the wallet
+            keystore: the encrypted JSON keystore to unlock. Defaults to self.keystore.
+        """
+        if keystore is None:
+            keystore = self.keystore
+        if keystore is None:
+            raise SimbaKeystoreException("No keystore to unlock")
+        keystore = load_keystore(keystore)
+        cache = self._wallet.unlock_cache
+        private_key = cache.get(keystore, passkey) if cache is not None else None
+        if private_key is None:
+            private_key = await self._run(decrypt_keystore, keystore, passkey)
+            if cache is not None:
+                cache.put(keystore, passkey, private_key)
+        await self.generate_from_private_key(private_key.hex())
+
+    async def generate_from_mnemonic(self, mnemonic: str = None):
+        """
+        Create a new wallet using that wallet mnemonic. Set self.wallet to this new wallet.
+
+        Args:
+            mnemonic: A string the wallet will use to create the wallet
+        """
+        self._adopt(await self._run(_generate_from_mnemonic, mnemonic))
+
+    async def generate_from_private_key(self, private_key):
+        """
+        Create a new wallet using that private key. Set self.wallet to this new wallet.
+
+        Args:
+            private_key: the private key in hex representation
+        """
+        self._adopt(await self._run(_generate_from_private_key, private_key))
+
+    def _adopt(self, generated: Wallet):
+        """
+        Take over the wallet and signing key of a wallet generated in the executor
+
+        Args:
+            generated: the generated wallet
+        """
+        self._wallet.wallet = generated.wallet
+        self._wallet._signing_key = generated._signing_key
+
+    def delete_wallet(self):
+        """
+        Remove the current wallet
+        """
+        self._wallet.delete_wallet()
+
+    def wallet_exists(self) -> bool:
+        """
+        Does a wallet currently exists?
+
+        Returns:
+            Returns a boolean indicating if a wallet exist.
+        """
+        return self._wallet.wallet_exists()
+
+    async def sign_transaction(
+        self, payload: dict, output: str = OUTPUT_DICT
+    ) -> Union[dict, SignedTransaction]:
+        """
+        Sign the transaction payload with the wallet
+
+        Args:
+            payload: a transaction object
+            output: "dict" or "raw", as for Wallet.sign_transaction
+        Returns:
+            Returns the signed transaction
+        """
+        check_output(output)
+        metrics = self.metrics
+        if metrics is None:
+            return await self._sign_transaction(payload, output)
+        try:
+            signed = await self._sign_transaction(payload, output, metrics)
+        except Exception as exc:
+            metrics.increment(
+                "sign_transaction.failed", tags={"exception": type(exc).__name__}
+            )
+            raise
+        metrics.increment("sign_transaction.signed")
+        return signed
+
+    async def _sign_transaction(
+        self, payload: dict, output: str, metrics: MetricsSink = None
+    ) -> Union[dict, SignedTransaction]:
+        """
+        Sign the transaction payload in the executor. If there is a metrics sink, the stage
+        timings are recorded in the executor and emitted here, as for Wallet.sign_transaction.
+
+        Args:
+            payload: a transaction object
+            output: the output format
+            metrics: the metrics sink, or None
+        Returns:
+            Returns the signed transaction
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        payload, nonce = self._wallet._allocate_nonce(payload)
+        try:
+            if metrics is None:
+                signed = await self._run(
+                    _sign_payload, payload, self._wallet._get_signing_key(), output
+                )
+            else:
+                start = time.perf_counter()
+                signing_key = self._wallet._get_signing_key()
+                metrics.timing("sign_transaction.key", time.perf_counter() - start)
+                signed, timings = await self._run(
+                    _sign_payload_timed, payload, signing_key, output
+                )
+                for name, seconds in timings:
+                    metrics.timing(name, seconds)
+        except SimbaTransactionException:
+            self._wallet._release_nonce(payload, nonce)
+            raise
+        return with_nonce(signed, nonce)
+
+    async def sign_transactions(
+        self, payloads: Sequence[dict], output: str = OUTPUT_DICT
+    ) -> List[Union[dict, SignedTransaction, SimbaTransactionException]]:
+        """
+        Sign a batch of transaction payloads concurrently, bounded by max_concurrency
+
+        Args:
+            payloads: a sequence of transaction objects
+            output: "dict" or "raw", as for Wallet.sign_transaction
+        Returns:
+            Returns a list in the same order as the payloads. Each entry is either
+            the signed transaction, or the exception raised for that payload, usually
+            a SimbaTransactionException.
+        """
+        check_output(output)
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        signing_key = self._wallet._get_signing_key()
+        allocated = self._wallet._allocate_nonces(payloads)
+        results = await asyncio.gather(
+            *(
+                _failed(payload)
+                if isinstance(payload, Exception)
+                else self._run(_sign_payload_or_error, payload, signing_key, output)
+                for payload, _ in allocated
+            ),
+            return_exceptions=True,
+        )
+        for (payload, nonce), result in reversed(list(zip(allocated, results))):
+            if isinstance(result, Exception):
+                self._wallet._release_nonce(payload, nonce)
+            else:
+                with_nonce(result, nonce)
+        if self.metrics is not None:
+            failed = [result for result in results if isinstance(result, Exception)]
+            for result in failed:
+                self.metrics.increment(
+                    "sign_transaction.failed", tags={"exception": type(result).__name__}
+                )
+            if len(results) > len(failed):
+                self.metrics.increment(
+                    "sign_transaction.signed", len(results) - len(failed)
+                )
+        return results
+
+    async def sign(self, payload: Union[Message, dict]) -> dict:
+        """
+        Sign an EIP-191 message or EIP-712 typed data with the wallet. Hashing and
+        signing run in the executor.
+
+        Args:
+            payload: the message or typed data, as for Wallet.sign
+        Returns:
+            Returns the signature, as for Wallet.sign
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        return await self._run(_sign_message, payload, self._wallet._get_signing_key())
+
+    async def sign_messages(
+        self, payloads: Sequence[Union[Message, dict]]
+    ) -> List[Union[dict, SimbaMessageException]]:
+        """
+        Sign a batch of messages or typed data concurrently, bounded by max_concurrency
+
+        Args:
+            payloads: a sequence of payloads, as for Wallet.sign
+        Returns:
+            Returns a list in the same order as the payloads. Each entry is either
+            the signature, or the exception raised for that payload, usually
+            a SimbaMessageException.
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        signing_key = self._wallet._get_signing_key()
+        return await asyncio.gather(
+            *(
+                self._run(_sign_message_or_error, payload, signing_key)
+                for payload in payloads
+            ),
+            return_exceptions=True,
+        )
+
+    def get_address(self):
+        """
+        The address associated with this wallet
+
+        Returns:
+            Returns the address associated with this wallet
+        """
+        return self._wallet.get_address()
+
+
+def _generate_from_mnemonic(mnemonic: Optional[str]) -> Wallet:
+    wallet = Wallet()
+    wallet.generate_from_mnemonic(mnemonic)
+    return wallet
+
+
+def _generate_from_private_key(private_key: str) -> Wallet:
+    wallet = Wallet()
+    wallet.generate_from_private_key(private_key)
+    return wallet
+
+
+async def _failed(exc: Exception) -> Exception:
+    return exc
@@ -0,0 +1,253 @@
+from functools import lru_cache
+from itertools import chain
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+
+SLOT_SIZE = 32
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """
+    NumPy, if it is installed. It is optional, and only used to speed up batch encoding.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _use_numpy(use_numpy: Optional[bool]):
+    if use_numpy is False:
+        return None
+    numpy = _numpy()
+    if numpy is None and use_numpy:
+        raise ImportError("NumPy is not installed")
+    return numpy
+
+
+def encode_bytes32_buffer(
+    strings: Sequence[str], length: int, use_numpy: bool = None
+) -> memoryview:
+    """
+    Encode strings into one contiguous buffer of bytes32 slots.
+    Record i occupies bytes [i * length * 32, (i + 1) * length * 32) of the buffer.
+    Like convert_to_bytes32_array, strings that do not fit into length slots are truncated.
+    :param strings: the strings to encode
+    :param length: the number of bytes32 slots per string
+    :param use_numpy: whether to fill the buffer with NumPy. If None, NumPy is used if installed.
+    :return: a memoryview over the buffer
+    """
+    record_size = SLOT_SIZE * length
+    numpy = _use_numpy(use_numpy)
+    if numpy is not None:
+        # fixed width bytes arrays pad with zeros and truncate
+        encoded = numpy.array(
+            [string.encode("utf8") for string in strings], dtype=f"S{record_size}"
+        )
+        return memoryview(encoded.view(numpy.uint8))
+    buffer = bytearray(record_size * len(strings))
+    offset = 0
+    for string in strings:
+        encoded = string.encode("utf8")[:record_size]
+        buffer[offset : offset + len(encoded)] = encoded
+        offset += record_size
+    return memoryview(buffer)
+
+
+def encode_bytes32_batch(
+    strings: Sequence[str], length: int, prefix: bool = True, use_numpy: bool = None
+) -> List[List[str]]:
+    """
+    Convert many strings to arrays of bytes32 in hex representation,
+    as convert_to_bytes32_array does for a single string.
+    The strings are encoded into one buffer which is hex encoded in one call.
+    :param strings: the strings to convert
+    :param length: the length of each array
+    :param prefix: whether or not to prefix the hex strings with '0x'.
+    :param use_numpy: whether to fill the buffer with NumPy. If None, NumPy is used if installed.
+    :return: a list of arrays of bytes32 in hex representation
+    """
+    buffer = encode_bytes32_buffer(strings, length, use_numpy=use_numpy)
+    if not len(buffer):
+        return []
+    # hex encode the whole buffer in one call, with a separator between slots
+    hexed = buffer.hex(" ", SLOT_SIZE)
+    if prefix:
+        hexed = "0x" + hexed.replace(" ", " 0x")
+    slots = hexed.split(" ")
+    return [slots[offset : offset + length] for offset in range(0, len(slots), length)]
+
+
+def decode_bytes32_batch(
+    records: Union[Sequence[Sequence[str]], bytes, bytearray, memoryview],
+    length: int = None,
+    use_numpy: bool = None,
+) -> List[str]:
+    """
+    Convert many arrays of bytes32 to strings, as convert_bytes32_to_string does
+    for a single array.
+    :param records: either a sequence of arrays of bytes32 in hex representation,
+           or a contiguous buffer as returned by encode_bytes32_buffer.
+    :param length: the number of slots to convert per record. Required for buffer input.
+           For array input, defaults to the length of the first array.
+    :param use_numpy: whether to split the buffer with NumPy. If None, NumPy is used if installed.
+    :return: a list of strings
+    """
+    if isinstance(records, (bytes, bytearray, memoryview)):
+        if length is None:
+            raise ValueError("length is required to decode a buffer")
+        buffer = records
+    else:
+        if length is None:
+            length = len(records[0]) if records else 0
+        for record in records:
+            if len(record) < length:
+                raise ValueError(f"Expected at least {length} slots, got {len(record)}")
+        hexed = "".join(chain.from_iterable(record[:length] for record in records))
+        # "0x" cannot occur inside hex digits, so prefixes are removed in one call
+        buffer = bytes.fromhex(hexed.replace("0x", ""))
+    if not len(buffer):
+        return []
+    record_size = SLOT_SIZE * length
+    if not record_size or len(buffer) % record_size:
+        raise ValueError(f"Buffer size is not a multiple of {record_size}")
+    numpy = _use_numpy(use_numpy)
+    if numpy is not None:
+        # fixed width bytes items come back with trailing zeros removed
+        parts = numpy.frombuffer(buffer, dtype=f"S{record_size}").tolist()
+    else:
+        buffer = memoryview(buffer)
+        parts = (
+            bytes(buffer[offset : offset + record_size])
+            for offset in range(0, len(buffer), record_size)
+        )
+    return [part.strip(b"\x00").decode("utf8") for part in parts]
+
+
+class RecordCodec:
+    """
+    Encodes and decodes dict records with a fixed layout, e.g., NFT metadata where the
+    name takes 1 bytes32 slot, the description 4 slots and the content hash is passed
+    as is. The layout is compiled once into byte offsets and slot ranges. Each record is
+    packed into a single buffer that is hex encoded in one call, rather than one
+    conversion per field.
+    """
+
+    __slots__ = ("fields", "slots", "truncate", "_packed", "_layout")
+
+    def __init__(self, fields: Mapping[str, Optional[int]], truncate: bool = False):
+        """
+        :param fields: the field names, in order, mapped to the number of bytes32 slots
+               for the field. A field mapped to None is passed through unchanged.
+        :param truncate: whether to truncate strings that do not fit into their slots,
+               as convert_to_bytes32_array does. By default such strings raise a ValueError.
+        """
+        packed = []
+        layout = []
+        offset = 0
+        for name, length in fields.items():
+            if length is None:
+                layout.append((name, None))
+                continue
+            if not isinstance(length, int) or isinstance(length, bool) or length < 1:
+                raise ValueError(f"Invalid slot count for field {name}: {length!r}")
+            packed.append((name, offset * SLOT_SIZE, length * SLOT_SIZE, length))
+            layout.append((name, slice(offset, offset + length)))
+            offset += length
+        self.fields = dict(fields)
+        self.slots = offset
+        self.truncate = truncate
+        # (name, byte offset, byte size, slot count) of the fields with slots
+        self._packed = tuple(packed)
+        # (name, slot range) of every field, None for fields passed through
+        self._layout = tuple(layout)
+
+    def encode(self, record: Mapping, prefix: bool = True) -> dict:
+        """
+        Encode a record into contract arguments
+        :param record: the record, with a string value for every field with slots
+        :param prefix: whether or not to prefix the hex strings with '0x'.
+        :return: a dict with an array of bytes32 in hex representation for every field
+                 with slots, and the unchanged value of every other field
+        """
+        buffer = bytearray(self.slots * SLOT_SIZE)
+        try:
+            for name, start, size, length in self._packed:
+                encoded = record[name].encode("utf8")
+                if len(encoded) > size:
+                    if not self.truncate:
+                        raise ValueError(
+                            f"Field {name} is {len(encoded)} bytes, "
+                            f"more than its {length} slots hold ({size} bytes)"
+                        )
+                    encoded = encoded[:size]
+                buffer[start : start + len(encoded)] = encoded
+            hexed = buffer.hex(" ", SLOT_SIZE)
+            if prefix:
+                hexed = "0x" + hexed.replace(" ", " 0x")
+            slots = hexed.split(" ")
+            return {
+                name: record[name] if slots_range is None else slots[slots_range]
+                for name, slots_range in self._layout
+            }
+        except KeyError as exc:
+            raise ValueError(f"Missing field: {exc.args[0]}")
+
+    def decode(self, encoded: Mapping) -> dict:
+        """
+        Decode contract arguments, as produced by encode, back into a record
+        :param encoded: a dict with an array of bytes32 in hex representation, or a single
+               bytes32 for one slot fields, for every field with slots
+        :return: the record
+        """
+        slots = []
+        try:
+            for name, _, _, length in self._packed:
+                value = encoded[name]
+                if isinstance(value, str):
+                    value = [value]
+                if len(value) < length:
+                    raise ValueError(
+                        f"Field {name} needs {length} slots, got {len(value)}"
+                    )
+                slots.extend(value[:length])
+            # "0x" cannot occur inside hex digits, so prefixes are removed in one call
+            buffer = bytes.fromhex("".join(slots).replace("0x", ""))
+            record = {}
+            for name, slots_range in self._layout:
+                if slots_range is None:
+                    record[name] = encoded[name]
+                else:
+                    record[name] = (
+                        buffer[
+                            slots_range.start * SLOT_SIZE : slots_range.stop * SLOT_SIZE
+                        ]
+                        .strip(b"\x00")
+                        .decode("utf8")
+                    )
+            return record
+        except KeyError as exc:
+            raise ValueError(f"Missing field: {exc.args[0]}")
+
+    def encode_many(
+        self, records: Iterable[Mapping], prefix: bool = True
+    ) -> Iterator[dict]:
+        """
+        Lazily encode a stream of records
+        :param records: the records
+        :param prefix: whether or not to prefix the hex strings with '0x'.
+        :return: a generator of encoded records, as for encode
+        """
+        for record in records:
+            yield self.encode(record, prefix)
+
+    def decode_many(self, encoded: Iterable[Mapping]) -> Iterator[dict]:
+        """
+        Lazily decode a stream of encoded records
+        :param encoded: the encoded records
+        :return: a generator of records, as for decode
+        """
+        for record in encoded:
+            yield self.decode(record)
@@ -0,0 +1,283 @@
+import os
+
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from libsimba_utils import keccak
+from libsimba_utils.exceptions import SimbaTransactionException
+from libsimba_utils.wallet_base import WalletBase
+
+
+RawTransaction = Union[str, bytes]
+Source = Union[str, os.PathLike, Iterable[RawTransaction]]
+
+LEGACY_TYPE = 0
+ACCESS_LIST_TYPE = 1
+EIP1559_TYPE = 2
+
+# field names of the signed payloads, without v, r, s
+_TYPED_FIELDS = {
+    ACCESS_LIST_TYPE: (
+        "chainId",
+        "nonce",
+        "gasPrice",
+        "gas",
+        "to",
+        "value",
+        "data",
+        "accessList",
+    ),
+    EIP1559_TYPE: (
+        "chainId",
+        "nonce",
+        "maxPriorityFeePerGas",
+        "maxFeePerGas",
+        "gas",
+        "to",
+        "value",
+        "data",
+        "accessList",
+    ),
+}
+_LEGACY_FIELDS = ("nonce", "gasPrice", "gas", "to", "value", "data")
+_INT_FIELDS = {
+    "chainId",
+    "nonce",
+    "gasPrice",
+    "maxPriorityFeePerGas",
+    "maxFeePerGas",
+    "gas",
+    "value",
+}
+
+
+def _to_raw(raw_transaction: RawTransaction) -> bytes:
+    if isinstance(raw_transaction, (bytes, bytearray, memoryview)):
+        return bytes(raw_transaction)
+    raw_transaction = raw_transaction.strip()
+    if raw_transaction.startswith("0x"):
+        raw_transaction = raw_transaction[2:]
+    return bytes.fromhex(raw_transaction)
+
+
+def _check_bytes(name: str, item) -> bytes:
+    # well formed RLP may still nest a list where a field expects a string
+    if not isinstance(item, bytes):
+        raise ValueError(f"{name} must be a byte string")
+    return item
+
+
+def _access_list(items) -> List[dict]:
+    from eth_utils import to_checksum_address
+
+    if not isinstance(items, list):
+        raise ValueError("accessList must be a list")
+    access_list = []
+    for entry in items:
+        if not isinstance(entry, list) or len(entry) != 2:
+            raise ValueError("accessList entries must be [address, storageKeys]")
+        address, storage_keys = entry
+        if not isinstance(storage_keys, list):
+            raise ValueError("accessList storageKeys must be a list")
+        access_list.append(
+            {
+                "address": to_checksum_address(
+                    _check_bytes("accessList address", address)
+                ),
+                "storageKeys": [
+                    f"0x{_check_bytes('accessList storage key', key).hex()}"
+                    for key in storage_keys
+                ],
+            }
+        )
+    return access_list
+
+
+def decode_transaction(raw_transaction: RawTransaction, recover: bool = True) -> dict:
+    """
+    Decode a signed legacy, EIP-2930 or EIP-1559 transaction, as produced by
+    Wallet.sign_transaction.
+
+    Args:
+        raw_transaction: the signed transaction as bytes or in hex representation
+        recover: whether to recover the sender address into the "from" field
+    Returns:
+        Returns the transaction fields. Quantities are ints, addresses are checksum
+        addresses, and data and hash are hex strings.
+    """
+    import rlp
+
+    from eth_utils import to_checksum_address
+
+    try:
+        raw = _to_raw(raw_transaction)
+        if not raw:
+            raise ValueError("empty transaction")
+        if raw[0] >= 0xC0:
+            transaction_type = LEGACY_TYPE
+            items = rlp.decode(raw)
+            names = _LEGACY_FIELDS
+        elif raw[0] in _TYPED_FIELDS:
+            transaction_type = raw[0]
+            items = rlp.decode(raw[1:])
+            names = _TYPED_FIELDS[transaction_type]
+        else:
+            raise ValueError(f"unsupported transaction type {raw[0]}")
+        if not isinstance(items, list) or len(items) != len(names) + 3:
+            raise ValueError("unexpected number of fields")
+
+        decoded = {"type": transaction_type}
+        for name, item in zip(names, items):
+            if name in _INT_FIELDS:
+                decoded[name] = int.from_bytes(_check_bytes(name, item), "big")
+            elif name == "to":
+                item = _check_bytes(name, item)
+                decoded[name] = to_checksum_address(item) if item else None
+            elif name == "data":
+                decoded[name] = f"0x{_check_bytes(name, item).hex()}"
+            else:
+                decoded[name] = _access_list(item)
+        v, r, s = (
+            int.from_bytes(_check_bytes("signature", item), "big")
+            for item in items[len(names) :]
+        )
+        decoded.update(v=v, r=r, s=s, hash=f"0x{keccak.new(256, raw).hexdigest()}")
+
+        if transaction_type != LEGACY_TYPE:
+            recovery_id = v
+            unsigned = raw[:1] + rlp.encode(items[: len(names)])
+        elif v in (27, 28):
+            decoded["chainId"] = None
+            recovery_id = v - 27
+            unsigned = rlp.encode(items[: len(names)])
+        else:
+            # EIP-155
+            decoded["chainId"] = (v - 35) // 2
+            recovery_id = (v - 35) % 2
+            unsigned = rlp.encode(items[: len(names)] + [decoded["chainId"], b"", b""])
+        if recover:
+            decoded["from"] = _recover_sender(
+                keccak.new(256, unsigned).digest(), recovery_id, r, s
+            )
+    except (rlp.DecodingError, TypeError, ValueError) as exc:
+        raise SimbaTransactionException(f"Invalid raw transaction: {exc}")
+    return decoded
+
+
+def _recover_sender(message_hash: bytes, recovery_id: int, r: int, s: int) -> str:
+    from eth_keys import keys
+    from eth_keys.exceptions import BadSignature, ValidationError
+
+    try:
+        signature = keys.Signature(vrs=(recovery_id, r, s))
+        public_key = signature.recover_public_key_from_msg_hash(message_hash)
+    except (BadSignature, ValidationError) as exc:
+        raise ValueError(f"cannot recover sender: {exc}")
+    return public_key.to_checksum_address()
+
+
+def _decode_or_error(
+    raw_transaction: RawTransaction, recover: bool
+) -> Union[dict, SimbaTransactionException]:
+    try:
+        return decode_transaction(raw_transaction, recover)
+    except SimbaTransactionException as exc:
+        return exc
+
+
+def _decode_chunk(
+    chunk: List[RawTransaction], recover: bool
+) -> List[Union[dict, SimbaTransactionException]]:
+    return [_decode_or_error(raw_transaction, recover) for raw_transaction in chunk]
+
+
+def iter_raw_transactions(source: Source) -> Iterator[RawTransaction]:
+    """
+    Lazily read signed transactions
+
+    Args:
+        source: the path of a file with one hex encoded transaction per line,
+                or an iterable of transactions as bytes or hex strings
+    Returns:
+        Returns a generator of transactions. Blank lines are skipped.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as lines:
+            for line in lines:
+                line = line.strip()
+                if line:
+                    yield line
+    else:
+        yield from source
+
+
+def iter_decode(
+    source: Source,
+    recover: bool = True,
+    workers: int = None,
+    chunksize: int = 256,
+) -> Iterator[Union[dict, SimbaTransactionException]]:
+    """
+    Lazily decode signed transactions, optionally fanning sender recovery out
+    across worker processes. Only a bounded number of chunks is in flight, so
+    arbitrarily large sources can be streamed.
+
+    Args:
+        source: a file path or an iterable of transactions, as for iter_raw_transactions
+        recover: whether to recover the sender address into the "from" field
+        workers: the number of worker processes. If not set, or less than 2,
+                 transactions are decoded in the current process.
+        chunksize: the number of transactions sent to a worker at a time
+    Returns:
+        Returns a generator in source order. Each entry is either the decoded
+        transaction, or the SimbaTransactionException raised for that transaction.
+    """
+    raw_transactions = iter_raw_transactions(source)
+    if not workers or workers < 2:
+        for raw_transaction in raw_transactions:
+            yield _decode_or_error(raw_transaction, recover)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(islice(raw_transactions, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_decode_chunk, chunk, recover))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def verify_senders(
+    source: Source,
+    expected: Union[str, WalletBase],
+    workers: int = None,
+    chunksize: int = 256,
+) -> Iterator[Tuple[int, Union[dict, SimbaTransactionException]]]:
+    """
+    Check that signed transactions were sent by the expected address
+
+    Args:
+        source: a file path or an iterable of transactions, as for iter_raw_transactions
+        expected: the expected sender address, or a wallet whose address is expected
+        workers: the number of worker processes to recover senders with
+        chunksize: the number of transactions sent to a worker at a time
+    Returns:
+        Returns a generator of (index, transaction) for every transaction whose sender does
+        not match, and (index, exception) for every transaction that could not be decoded.
+    """
+    if isinstance(expected, WalletBase):
+        expected = expected.get_address()
+    expected = expected.lower()
+    decoded = iter_decode(source, recover=True, workers=workers, chunksize=chunksize)
+    for index, transaction in enumerate(decoded):
+        if isinstance(transaction, SimbaTransactionException):
+            yield index, transaction
+        elif transaction["from"].lower() != expected:
+            yield index, transaction
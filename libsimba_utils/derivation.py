@@ -0,0 +1,200 @@
+import hashlib
+import hmac
+import struct
+import unicodedata
+
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from libsimba_utils.exceptions import SimbaMnemonicException
+
+
+# order of the secp256k1 curve
+SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+HARDENED = 0x80000000
+ETHEREUM_COIN_TYPE = 60
+
+
+class DerivedAccount(NamedTuple):
+    index: int
+    path: str
+    address: str
+    private_key: str
+
+
+def mnemonic_to_seed(mnemonic: str, passphrase: str = None) -> bytes:
+    """
+    Stretch a BIP39 mnemonic into a 64 byte seed. This runs 2048 rounds of PBKDF2
+    and is the most expensive step of deriving an account.
+
+    Args:
+        mnemonic: the mnemonic words
+        passphrase: an optional BIP39 passphrase
+    Returns:
+        Returns the seed
+    """
+    from hdwallet.utils import is_mnemonic
+
+    if not is_mnemonic(mnemonic, language="english"):
+        raise SimbaMnemonicException("Invalid mnemonic words.")
+    mnemonic = unicodedata.normalize("NFKD", mnemonic)
+    salt = unicodedata.normalize("NFKD", f"mnemonic{passphrase or ''}")
+    return hashlib.pbkdf2_hmac("sha512", mnemonic.encode(), salt.encode(), 2048)
+
+
+def _compressed_public_key(private_key: bytes) -> bytes:
+    from eth_keys import keys
+
+    return keys.PrivateKey(private_key).public_key.to_compressed_bytes()
+
+
+def _derive_child(
+    private_key: bytes, chain_code: bytes, index: int
+) -> Tuple[bytes, bytes]:
+    """
+    BIP32 private parent key to private child key derivation
+    """
+    if index & HARDENED:
+        data = b"\0" + private_key + struct.pack(">L", index)
+    else:
+        data = _compressed_public_key(private_key) + struct.pack(">L", index)
+    digest = hmac.new(chain_code, data, hashlib.sha512).digest()
+    tweak = int.from_bytes(digest[:32], "big")
+    child = (tweak + int.from_bytes(private_key, "big")) % SECP256K1_N
+    if tweak >= SECP256K1_N or child == 0:
+        raise SimbaMnemonicException(f"Invalid child key at index {index}")
+    return child.to_bytes(32, "big"), digest[32:]
+
+
+class AccountDeriver:
+    """
+    Derives the accounts at m/44'/60'/account'/change/index from a single mnemonic.
+    The seed and the parent node at m/44'/60'/account'/change are computed once,
+    so each account only costs one child derivation.
+    """
+
+    def __init__(
+        self, mnemonic: str, passphrase: str = None, account: int = 0, change: int = 0
+    ):
+        """
+        Args:
+            mnemonic: the mnemonic words
+            passphrase: an optional BIP39 passphrase
+            account: the BIP44 account
+            change: the BIP44 change level, 0 for external addresses
+        """
+        seed = mnemonic_to_seed(mnemonic, passphrase)
+        digest = hmac.new(b"Bitcoin seed", seed, hashlib.sha512).digest()
+        private_key, chain_code = digest[:32], digest[32:]
+        for index in (
+            44 | HARDENED,
+            ETHEREUM_COIN_TYPE | HARDENED,
+            account | HARDENED,
+            change,
+        ):
+            private_key, chain_code = _derive_child(private_key, chain_code, index)
+        self.base_path = f"m/44'/{ETHEREUM_COIN_TYPE}'/{account}'/{change}"
+        self._chain_code = chain_code
+        # the data every non-hardened child is derived from
+        self._public_key = _compressed_public_key(private_key)
+        self._parent = int.from_bytes(private_key, "big")
+
+    def derive(self, index: int) -> DerivedAccount:
+        """
+        Derive a single account
+
+        Args:
+            index: the address index
+        Returns:
+            Returns the derived account
+        """
+        from eth_keys import keys
+
+        if not 0 <= index < HARDENED:
+            raise ValueError(f"Invalid address index: {index}")
+        digest = hmac.new(
+            self._chain_code,
+            self._public_key + struct.pack(">L", index),
+            hashlib.sha512,
+        ).digest()
+        tweak = int.from_bytes(digest[:32], "big")
+        child = (tweak + self._parent) % SECP256K1_N
+        if tweak >= SECP256K1_N or child == 0:
+            raise SimbaMnemonicException(f"Invalid child key at index {index}")
+        private_key = keys.PrivateKey(child.to_bytes(32, "big"))
+        return DerivedAccount(
+            index=index,
+            path=f"{self.base_path}/{index}",
+            address=private_key.public_key.to_checksum_address(),
+            private_key=private_key.to_bytes().hex(),
+        )
+
+    def iter_accounts(
+        self, start: int = 0, count: int = None
+    ) -> Iterator[DerivedAccount]:
+        """
+        Lazily derive consecutive accounts
+
+        Args:
+            start: the first address index
+            count: the number of accounts to derive. If not set, the generator does not end.
+        Returns:
+            Returns a generator of derived accounts
+        """
+        index = start
+        while count is None or index < start + count:
+            yield self.derive(index)
+            index += 1
+
+    def accounts(self, start: int = 0, count: int = 1) -> List[DerivedAccount]:
+        """
+        Derive consecutive accounts
+
+        Args:
+            start: the first address index
+            count: the number of accounts to derive
+        Returns:
+            Returns a list of derived accounts
+        """
+        return list(self.iter_accounts(start, count))
+
+    def wallet(self, index: int):
+        """
+        Create a Wallet for a derived account
+
+        Args:
+            index: the address index
+        Returns:
+            Returns a Wallet holding the private key of the account
+        """
+        from libsimba_utils.wallet import Wallet
+
+        wallet = Wallet()
+        wallet.generate_from_private_key(self.derive(index).private_key)
+        return wallet
+
+
+def derive_accounts(
+    mnemonic: str,
+    start: int = 0,
+    count: Optional[int] = None,
+    passphrase: str = None,
+    account: int = 0,
+    change: int = 0,
+) -> Iterator[DerivedAccount]:
+    """
+    Lazily derive consecutive accounts at m/44'/60'/account'/change/index from a mnemonic
+
+    Args:
+        mnemonic: the mnemonic words
+        start: the first address index
+        count: the number of accounts to derive. If not set, the generator does not end.
+        passphrase: an optional BIP39 passphrase
+        account: the BIP44 account
+        change: the BIP44 change level
+    Returns:
+        Returns a generator of derived accounts
+    """
+    deriver = AccountDeriver(
+        mnemonic, passphrase=passphrase, account=account, change=change
+    )
+    return deriver.iter_accounts(start, count)
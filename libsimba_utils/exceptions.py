@@ -12,3 +12,23 @@ class SimbaPrivateKeyException(Exception):
 
 class SimbaWalletNotFoundException(Exception):
     pass
+
+
+class SimbaNonceException(Exception):
+    pass
+
+
+class SimbaKeystoreException(Exception):
+    pass
+
+
+class SimbaMessageException(Exception):
+    pass
+
+
+class SimbaMerkleException(Exception):
+    pass
+
+
+class SimbaSignerException(Exception):
+    pass
@@ -0,0 +1,69 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+class MetricsSink:
+    """
+    Receives timings and counters from instrumented wallet operations.
+    Subclass this to forward metrics to a metrics pipeline, and set it as the
+    metrics attribute of a wallet. Wallets without a sink skip all instrumentation.
+
+    Metrics emitted by Wallet.sign_transaction and AsyncWallet.sign_transaction:
+        timings:  sign_transaction.parse, sign_transaction.key,
+                  sign_transaction.sign, sign_transaction.serialize
+        counters: sign_transaction.signed,
+                  sign_transaction.failed, tagged with the exception type
+
+    Metrics emitted by SignerServer:
+        counters: signer.batches, signer.requests
+    """
+
+    def timing(self, name: str, seconds: float, tags: Dict[str, str] = None):
+        """
+        Record the duration of a stage
+
+        Args:
+            name: the metric name
+            seconds: the duration in seconds
+            tags: optional tags
+        """
+        raise NotImplementedError("MetricsSink.timing Not Implemented")
+
+    def increment(self, name: str, value: int = 1, tags: Dict[str, str] = None):
+        """
+        Increment a counter
+
+        Args:
+            name: the metric name
+            value: the amount to increment by
+            tags: optional tags
+        """
+        raise NotImplementedError("MetricsSink.increment Not Implemented")
+
+
+class RecordingMetricsSink(MetricsSink):
+    """
+    Keeps metrics in memory, for tests and ad hoc profiling
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.counters: Dict[Tuple[str, Optional[Tuple]], int] = defaultdict(int)
+
+    def timing(self, name: str, seconds: float, tags: Dict[str, str] = None):
+        self.timings[name].append(seconds)
+
+    def increment(self, name: str, value: int = 1, tags: Dict[str, str] = None):
+        self.counters[(name, tuple(sorted(tags.items())) if tags else None)] += value
+
+    def count(self, name: str, **tags) -> int:
+        """
+        The value of a counter
+
+        Args:
+            name: the metric name
+            tags: the tags the counter was incremented with
+        Returns:
+            Returns the counter value
+        """
+        return self.counters[(name, tuple(sorted(tags.items())) if tags else None)]
@@ -0,0 +1,199 @@
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Union
+
+
+Hashable = Union[str, bytes, bytearray, memoryview]
+
+# fastest first. pysha3 (or a fork providing the same sha3 module) is a C extension with
+# little per call overhead, roughly 6x faster than pycryptodome for short values.
+BACKEND_PREFERENCE = ("pysha3", "pycryptodome")
+
+_backend_name: Optional[str] = None
+# maps a digest size to a constructor taking the initial data
+_backend: Optional[Callable[[int], Callable[[bytes], object]]] = None
+
+
+def _load_pysha3() -> Callable[[int], Callable[[bytes], object]]:
+    import sha3
+
+    constructors = {
+        224: sha3.keccak_224,
+        256: sha3.keccak_256,
+        384: sha3.keccak_384,
+        512: sha3.keccak_512,
+    }
+
+    def constructor(bits: int):
+        try:
+            return constructors[bits]
+        except KeyError:
+            raise ValueError(f"Unsupported keccak digest size: {bits}")
+
+    return constructor
+
+
+def _load_pycryptodome() -> Callable[[int], Callable[[bytes], object]]:
+    from Crypto.Hash import keccak
+
+    def constructor(bits: int):
+        if bits not in (224, 256, 384, 512):
+            raise ValueError(f"Unsupported keccak digest size: {bits}")
+        return lambda data=b"": keccak.new(digest_bits=bits, data=data)
+
+    return constructor
+
+
+_LOADERS: Dict[str, Callable[[], Callable[[int], Callable[[bytes], object]]]] = {
+    "pysha3": _load_pysha3,
+    "pycryptodome": _load_pycryptodome,
+}
+
+
+def available_backends() -> List[str]:
+    """
+    The keccak backends that can be imported, fastest first
+    :return: a list of backend names
+    """
+    available = []
+    for name in BACKEND_PREFERENCE:
+        try:
+            _LOADERS[name]()
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def set_backend(name: str = None):
+    """
+    Select the keccak implementation used by keccak_hash and friends.
+    :param name: the backend name, one of BACKEND_PREFERENCE. If None, the fastest
+           available backend is selected.
+    """
+    global _backend_name, _backend
+    if name is None:
+        available = available_backends()
+        if not available:
+            raise ImportError(
+                f"No keccak backend available, install one of {BACKEND_PREFERENCE}"
+            )
+        name = available[0]
+    if name not in _LOADERS:
+        raise ValueError(f"Unknown keccak backend: {name}")
+    _backend = _LOADERS[name]()
+    _backend_name = name
+
+
+def get_backend() -> str:
+    """
+    The name of the selected keccak backend. The fastest available backend is
+    selected on first use.
+    :return: the backend name
+    """
+    if _backend_name is None:
+        set_backend()
+    return _backend_name
+
+
+def new(bits: int = 256, data: Hashable = b""):
+    """
+    Create a keccak hash object with the selected backend. It supports update, digest
+    and hexdigest, so it can be fed incrementally.
+    :param bits: the number of bits - 224, 256, 384 or 512
+    :param data: initial data to hash. Strings are UTF-8 encoded.
+    :return: a hash object
+    """
+    if _backend is None:
+        set_backend()
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return _backend(bits)(data)
+
+
+def hasher(bits: int = 256) -> Callable[[bytes], object]:
+    """
+    The hash object constructor of the selected backend for one digest size. Calling it
+    skips the dispatch in new, for loops that hash many short byte strings.
+    The constructor is bound to the backend selected when hasher is called.
+    :param bits: the number of bits - 224, 256, 384 or 512
+    :return: a callable taking the bytes to hash and returning a hash object
+    """
+    if _backend is None:
+        set_backend()
+    return _backend(bits)
+
+
+class KeccakCache:
+    """
+    A bounded LRU cache in front of keccak hashing, for values that are hashed repeatedly,
+    e.g., token identifiers.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        :param maxsize: the maximum number of digests to keep
+        """
+        self.maxsize = maxsize
+        self._digest = lru_cache(maxsize=maxsize)(self._compute)
+
+    @staticmethod
+    def _compute(value: Union[str, bytes], bits: int) -> bytes:
+        return new(bits, value).digest()
+
+    def digest(self, value: Hashable, bits: int = 256) -> bytes:
+        """
+        The keccak digest of a value, from the cache if it was hashed recently
+        :param value: the value to hash. Strings are UTF-8 encoded.
+        :param bits: the number of bits
+        :return: the raw digest
+        """
+        if not isinstance(value, (str, bytes)):
+            value = bytes(value)
+        return self._digest(value, bits)
+
+    def hash(
+        self, value: Hashable, bits: int = 256, as_hex: bool = True
+    ) -> Union[str, bytes]:
+        """
+        Hash a value, as keccak_hash does
+        :param value: the value to hash
+        :param bits: the number of bits
+        :param as_hex: whether to return a hex digest or the raw bytes
+        :return: the digest
+        """
+        digest = self.digest(value, bits)
+        return digest.hex() if as_hex else digest
+
+    def hash_many(
+        self, values: List[Hashable], bits: int = 256, as_hex: bool = True
+    ) -> List[Union[str, bytes]]:
+        """
+        Hash many values, as keccak_hash_many does
+        :param values: the values to hash
+        :param bits: the number of bits
+        :param as_hex: whether to return hex digests or the raw bytes
+        :return: a list of digests in the order of the values
+        """
+        return [self.hash(value, bits, as_hex) for value in values]
+
+    def uint256(self, value: Hashable, big_endian: bool = True) -> int:
+        """
+        Convert a value to an unsigned 256 bit integer, as string_to_uint256 does
+        :param value: the value to convert
+        :param big_endian: whether to use big or little endian byte order
+        :return: an integer
+        """
+        return int.from_bytes(self.digest(value), "big" if big_endian else "little")
+
+    def cache_info(self):
+        """
+        Hit and miss statistics of the cache
+        :return: the functools cache info
+        """
+        return self._digest.cache_info()
+
+    def clear(self):
+        """
+        Empty the cache
+        """
+        self._digest.cache_clear()
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from libsimba_utils.exceptions import SimbaKeystoreException
+
+
+Keystore = Union[str, bytes, dict, os.PathLike]
+
+
+def load_keystore(keystore: Keystore) -> dict:
+    """
+    Load an encrypted JSON keystore
+
+    Args:
+        keystore: the keystore as a dict, a JSON string, or the path of a keystore file
+    Returns:
+        Returns the keystore as a dict
+    """
+    if isinstance(keystore, dict):
+        return keystore
+    try:
+        if isinstance(keystore, bytes) or (
+            isinstance(keystore, str) and keystore.lstrip().startswith("{")
+        ):
+            return json.loads(keystore)
+        with open(keystore) as keystore_file:
+            return json.load(keystore_file)
+    except (OSError, ValueError) as exc:
+        raise SimbaKeystoreException(f"Invalid keystore: {exc}")
+
+
+def encrypt_keystore(
+    private_key: Union[str, bytes],
+    passkey: str,
+    kdf: str = "scrypt",
+    iterations: int = None,
+) -> dict:
+    """
+    Encrypt a private key into a version 3 JSON keystore
+
+    Args:
+        private_key: the private key as 32 bytes or in hex representation
+        passkey: the passkey to encrypt with
+        kdf: the key derivation function, "scrypt" or "pbkdf2"
+        iterations: the KDF work factor, i.e., n for scrypt or the iteration count for pbkdf2.
+                    If not set, the eth-keyfile defaults are used.
+    Returns:
+        Returns the keystore as a dict
+    """
+    from eth_keyfile import create_keyfile_json
+
+    if isinstance(private_key, str):
+        private_key = bytes.fromhex(
+            private_key[2:] if private_key.startswith("0x") else private_key
+        )
+    try:
+        return create_keyfile_json(
+            private_key, passkey.encode("utf-8"), kdf=kdf, iterations=iterations
+        )
+    except (NotImplementedError, ValueError) as exc:
+        raise SimbaKeystoreException(f"Cannot create keystore: {exc}")
+
+
+def decrypt_keystore(keystore: Keystore, passkey: str) -> bytes:
+    """
+    Decrypt the private key in a JSON keystore. This runs the keystore KDF,
+    which is deliberately expensive.
+
+    Args:
+        keystore: the keystore as a dict, a JSON string, or the path of a keystore file
+        passkey: the passkey the keystore was encrypted with
+    Returns:
+        Returns the private key
+    """
+    from eth_keyfile import decode_keyfile_json
+
+    try:
+        return decode_keyfile_json(load_keystore(keystore), passkey.encode("utf-8"))
+    except (KeyError, TypeError, ValueError, NotImplementedError) as exc:
+        raise SimbaKeystoreException(f"Unable to unlock keystore: {exc}")
+
+
+class UnlockCache:
+    """
+    Caches keystores that were unlocked recently, so that the KDF does not run for every
+    unlock. Entries are keyed by a digest of the keystore and passkey, and expire after
+    ttl seconds. Safe to use from multiple threads.
+
+    Cached private keys are held in plaintext in memory until they expire or are
+    evicted, including after the wallets that unlocked them are deleted. Caching is
+    opt-in: pass a cache explicitly, and call clear() when the keys are no longer needed.
+    """
+
+    def __init__(self, ttl: float = 300, maxsize: int = 1024):
+        """
+        Args:
+            ttl: the number of seconds an unlocked key is kept
+            maxsize: the maximum number of unlocked keys kept
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: Dict[bytes, Tuple[float, bytes]] = {}
+
+    @staticmethod
+    def _key(keystore: dict, passkey: str) -> bytes:
+        canonical = json.dumps(keystore, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{canonical}\0{passkey}".encode("utf-8")).digest()
+
+    def get(self, keystore: dict, passkey: str) -> Optional[bytes]:
+        """
+        The private key for a keystore unlocked with the passkey, if still cached
+
+        Args:
+            keystore: the keystore
+            passkey: the passkey
+        Returns:
+            Returns the private key, or None
+        """
+        key = self._key(keystore, passkey)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def put(self, keystore: dict, passkey: str, private_key: bytes):
+        """
+        Cache the private key of an unlocked keystore
+
+        Args:
+            keystore: the keystore
+            passkey: the passkey
+            private_key: the decrypted private key
+        """
+        key = self._key(keystore, passkey)
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                self._expire(now)
+                if len(self._entries) >= self.maxsize:
+                    # drop the entry closest to expiring
+                    del self._entries[
+                        min(self._entries, key=lambda k: self._entries[k][0])
+                    ]
+            self._entries[key] = (now + self.ttl, private_key)
+
+    def _expire(self, now: float):
+        for key in [key for key, entry in self._entries.items() if entry[0] <= now]:
+            del self._entries[key]
+
+    def clear(self):
+        """
+        Forget all unlocked keys
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
+
+
+def unlock_keystore(
+    keystore: Keystore,
+    passkey: str,
+    cache: Optional[UnlockCache] = None,
+) -> bytes:
+    """
+    Decrypt the private key in a JSON keystore, using the cache if it was unlocked recently
+
+    Args:
+        keystore: the keystore as a dict, a JSON string, or the path of a keystore file
+        passkey: the passkey the keystore was encrypted with
+        cache: the unlock cache, or None to always run the KDF
+    Returns:
+        Returns the private key
+    """
+    keystore = load_keystore(keystore)
+    if cache is not None:
+        private_key = cache.get(keystore, passkey)
+        if private_key is not None:
+            return private_key
+    private_key = decrypt_keystore(keystore, passkey)
+    if cache is not None:
+        cache.put(keystore, passkey, private_key)
+    return private_key
+
+
+def _decrypt_or_error(
+    keystore: dict, passkey: str
+) -> Union[bytes, SimbaKeystoreException]:
+    try:
+        return decrypt_keystore(keystore, passkey)
+    except SimbaKeystoreException as exc:
+        return exc
+
+
+def unlock_keystores(
+    keystores: Sequence[Keystore],
+    passkeys: Union[str, Sequence[str]],
+    workers: int = None,
+    cache: Optional[UnlockCache] = None,
+) -> List[Union[bytes, SimbaKeystoreException]]:
+    """
+    Decrypt many keystores, running the KDFs in parallel across worker processes.
+    Keystores that are cached are not decrypted again.
+
+    Args:
+        keystores: the keystores as dicts, JSON strings, or paths of keystore files
+        passkeys: one passkey for all keystores, or one passkey per keystore
+        workers: the number of worker processes. If not set, or less than 2,
+                 the keystores are decrypted in the current process.
+        cache: the unlock cache, or None to always run the KDF
+    Returns:
+        Returns a list in the same order as the keystores. Each entry is either
+        the private key, or the SimbaKeystoreException raised for that keystore.
+    """
+    if isinstance(passkeys, str):
+        passkeys = [passkeys] * len(keystores)
+    if len(passkeys) != len(keystores):
+        raise SimbaKeystoreException("Expected one passkey per keystore")
+
+    results: List[Union[bytes, SimbaKeystoreException, None]] = []
+    pending = []
+    for keystore, passkey in zip(keystores, passkeys):
+        try:
+            keystore = load_keystore(keystore)
+        except SimbaKeystoreException as exc:
+            results.append(exc)
+            continue
+        private_key = cache.get(keystore, passkey) if cache is not None else None
+        if private_key is None:
+            pending.append((len(results), keystore, passkey))
+        results.append(private_key)
+
+    if not workers or workers < 2 or len(pending) < 2:
+        decrypted = [
+            _decrypt_or_error(keystore, passkey) for _, keystore, passkey in pending
+        ]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            decrypted = list(
+                executor.map(
+                    _decrypt_or_error,
+                    [keystore for _, keystore, _ in pending],
+                    [passkey for _, _, passkey in pending],
+                )
+            )
+
+    for (index, keystore, passkey), private_key in zip(pending, decrypted):
+        results[index] = private_key
+        if cache is not None and not isinstance(private_key, Exception):
+            cache.put(keystore, passkey, private_key)
+    return results
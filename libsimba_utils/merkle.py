@@ -0,0 +1,177 @@
+from typing import Iterable, List, Union
+
+from libsimba_utils import keccak
+from libsimba_utils.exceptions import SimbaMerkleException
+
+
+NODE_SIZE = 32
+
+Node = Union[str, bytes, bytearray, memoryview]
+
+
+def _to_node(value: Node) -> bytes:
+    if isinstance(value, str):
+        try:
+            value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+        except ValueError:
+            raise SimbaMerkleException(f"Invalid hash: {value}")
+    else:
+        value = bytes(value)
+    if len(value) != NODE_SIZE:
+        raise SimbaMerkleException(f"Hashes must be 32 bytes, got {len(value)}")
+    return value
+
+
+def _format(node: bytes, as_hex: bool) -> Union[str, bytes]:
+    return node.hex() if as_hex else node
+
+
+def hash_pair(a: Node, b: Node, as_hex: bool = False) -> Union[str, bytes]:
+    """
+    Hash two nodes in sorted order, as OpenZeppelin's MerkleProof does
+    :param a: a 32 byte hash, as bytes or in hex representation
+    :param b: a 32 byte hash, as bytes or in hex representation
+    :param as_hex: whether to return a hex digest or the raw bytes
+    :return: keccak256 of the concatenation of the smaller and the larger hash
+    """
+    a, b = _to_node(a), _to_node(b)
+    return _format(keccak.new(256, a + b if a < b else b + a).digest(), as_hex)
+
+
+def process_proof(proof: Iterable[Node], leaf: Node) -> bytes:
+    """
+    Rebuild the root implied by a proof, as MerkleProof.processProof does
+    :param proof: the sibling hashes from the leaf up
+    :param leaf: the leaf hash
+    :return: the root
+    """
+    keccak256 = keccak.hasher(256)
+    computed = _to_node(leaf)
+    for sibling in proof:
+        sibling = _to_node(sibling)
+        pair = computed + sibling if computed < sibling else sibling + computed
+        computed = keccak256(pair).digest()
+    return computed
+
+
+def verify_proof(proof: Iterable[Node], root: Node, leaf: Node) -> bool:
+    """
+    Check that a leaf is part of a tree, as MerkleProof.verify does
+    :param proof: the sibling hashes from the leaf up
+    :param root: the root of the tree
+    :param leaf: the leaf hash
+    :return: whether the proof is valid
+    """
+    return process_proof(proof, leaf) == _to_node(root)
+
+
+class MerkleTree:
+    """
+    A keccak Merkle tree compatible with OpenZeppelin's MerkleProof. Pairs are hashed
+    in sorted order, and a node without a sibling is promoted to the level above
+    unchanged. Every level is a single bytearray of 32 byte hashes, so the tree needs
+    about 64 bytes per leaf. Appending a leaf only rehashes the nodes on the path
+    from the new leaf to the root.
+    """
+
+    __slots__ = ("_levels",)
+
+    def __init__(self, leaves: Iterable[Node] = ()):
+        """
+        :param leaves: the initial leaf hashes, as 32 bytes or in hex representation
+        """
+        self._levels: List[bytearray] = [bytearray()]
+        self.extend(leaves)
+
+    def __len__(self) -> int:
+        return len(self._levels[0]) // NODE_SIZE
+
+    def append(self, leaf: Node) -> int:
+        """
+        Add a leaf to the tree
+        :param leaf: the leaf hash, as 32 bytes or in hex representation
+        :return: the index of the leaf
+        """
+        self.extend((leaf,))
+        return len(self) - 1
+
+    def extend(self, leaves: Iterable[Node]):
+        """
+        Add many leaves to the tree. Only the nodes above the new leaves are hashed.
+        :param leaves: the leaf hashes, as 32 bytes or in hex representation
+        """
+        added = bytearray()
+        for leaf in leaves:
+            added += _to_node(leaf)
+        if added:
+            start = len(self)
+            self._levels[0] += added
+            self._rehash(start)
+
+    def _rehash(self, start: int):
+        """
+        Recompute the nodes above the leaves from index start onwards
+        :param start: the index of the first changed leaf
+        """
+        keccak256 = keccak.hasher(256)
+        levels = self._levels
+        depth = 0
+        while len(levels[depth]) > NODE_SIZE:
+            below = levels[depth]
+            count = len(below) // NODE_SIZE
+            if depth + 1 == len(levels):
+                levels.append(bytearray())
+            above = levels[depth + 1]
+            start //= 2
+            del above[start * NODE_SIZE :]
+            for index in range(start, count // 2):
+                offset = index * 2 * NODE_SIZE
+                left = below[offset : offset + NODE_SIZE]
+                right = below[offset + NODE_SIZE : offset + 2 * NODE_SIZE]
+                above += keccak256(
+                    left + right if left < right else right + left
+                ).digest()
+            if count % 2:
+                # promote the last node
+                above += below[-NODE_SIZE:]
+            depth += 1
+
+    def leaf(self, index: int, as_hex: bool = True) -> Union[str, bytes]:
+        """
+        :param index: the index of the leaf
+        :param as_hex: whether to return a hex digest or the raw bytes
+        :return: the leaf hash
+        """
+        self._check_index(index)
+        offset = index * NODE_SIZE
+        return _format(bytes(self._levels[0][offset : offset + NODE_SIZE]), as_hex)
+
+    def root(self, as_hex: bool = True) -> Union[str, bytes]:
+        """
+        :param as_hex: whether to return a hex digest or the raw bytes
+        :return: the root of the tree
+        """
+        if not len(self):
+            raise SimbaMerkleException("The tree has no leaves")
+        return _format(bytes(self._levels[-1]), as_hex)
+
+    def proof(self, index: int, as_hex: bool = True) -> List[Union[str, bytes]]:
+        """
+        The proof for a leaf, for MerkleProof.verify
+        :param index: the index of the leaf
+        :param as_hex: whether to return hex digests or the raw bytes
+        :return: the sibling hashes from the leaf up
+        """
+        self._check_index(index)
+        proof = []
+        for level in self._levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level) // NODE_SIZE:
+                offset = sibling * NODE_SIZE
+                proof.append(_format(bytes(level[offset : offset + NODE_SIZE]), as_hex))
+            index //= 2
+        return proof
+
+    def _check_index(self, index: int):
+        if not 0 <= index < len(self):
+            raise SimbaMerkleException(f"No leaf at index {index}")
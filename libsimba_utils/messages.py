@@ -0,0 +1,382 @@
+import json
+import re
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple, Union
+
+from libsimba_utils import keccak
+from libsimba_utils.exceptions import SimbaMessageException
+
+
+if TYPE_CHECKING:
+    from eth_keys.datatypes import PrivateKey
+
+
+Message = Union[str, bytes]
+
+# fields of EIP712Domain in the order required by EIP-712, used when the
+# typed data does not declare the domain type itself
+DOMAIN_FIELDS = (
+    ("name", "string"),
+    ("version", "string"),
+    ("chainId", "uint256"),
+    ("verifyingContract", "address"),
+    ("salt", "bytes32"),
+)
+
+_INT_TYPE = re.compile(r"^(u?)int(\d*)$")
+_BYTES_TYPE = re.compile(r"^bytes(\d+)$")
+_ARRAY_TYPE = re.compile(r"^(.+)\[(\d*)\]$")
+
+
+def _keccak(data: bytes) -> bytes:
+    return keccak.new(256, data).digest()
+
+
+def _to_bytes(value, type_name: str) -> bytes:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, str):
+        try:
+            return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+        except ValueError:
+            pass
+    raise SimbaMessageException(f"Invalid value for {type_name}: {value!r}")
+
+
+def _to_int(value, type_name: str) -> int:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value, 16) if value.startswith("0x") else int(value)
+        except ValueError:
+            pass
+    raise SimbaMessageException(f"Invalid value for {type_name}: {value!r}")
+
+
+def _int_encoder(signed: bool, bits: int, type_name: str) -> Callable:
+    if signed:
+        low, high = -(2 ** (bits - 1)), 2 ** (bits - 1)
+    else:
+        low, high = 0, 2**bits
+
+    def encode(value) -> bytes:
+        value = _to_int(value, type_name)
+        if not low <= value < high:
+            raise SimbaMessageException(f"Value out of range for {type_name}: {value}")
+        return (value % 2**256).to_bytes(32, "big")
+
+    return encode
+
+
+def _bytes_encoder(size: int, type_name: str) -> Callable:
+    def encode(value) -> bytes:
+        value = _to_bytes(value, type_name)
+        if len(value) > size:
+            raise SimbaMessageException(
+                f"Value too long for {type_name}: {len(value)} bytes"
+            )
+        return value.ljust(32, b"\x00")
+
+    return encode
+
+
+def _encode_address(value) -> bytes:
+    value = _to_bytes(value, "address")
+    if len(value) != 20:
+        raise SimbaMessageException(f"Invalid value for address: 0x{value.hex()}")
+    return value.rjust(32, b"\x00")
+
+
+def _encode_bool(value) -> bytes:
+    return (1 if value else 0).to_bytes(32, "big")
+
+
+def _encode_string(value) -> bytes:
+    if not isinstance(value, str):
+        raise SimbaMessageException(f"Invalid value for string: {value!r}")
+    return _keccak(value.encode("utf-8"))
+
+
+def _encode_dynamic_bytes(value) -> bytes:
+    return _keccak(_to_bytes(value, "bytes"))
+
+
+class TypedDataSchema:
+    """
+    The struct types of EIP-712 typed data, compiled once. Type hashes and the
+    encoder for every field are computed when the schema is built, so hashing a
+    message only encodes its values.
+    """
+
+    def __init__(self, types: Dict[str, List[dict]]):
+        """
+        Args:
+            types: the struct types, as in the "types" member of EIP-712 typed data
+        """
+        try:
+            self.fields: Dict[str, Tuple[Tuple[str, str], ...]] = {
+                name: tuple((field["name"], field["type"]) for field in fields)
+                for name, fields in types.items()
+            }
+        except (AttributeError, KeyError, TypeError) as exc:
+            raise SimbaMessageException(f"Invalid types: {exc}")
+        self._encoders: Dict[str, Callable] = {}
+        self.type_hashes = {
+            name: _keccak(self.encode_type(name).encode()) for name in self.fields
+        }
+        self._field_encoders = {
+            name: tuple(
+                (field, self._encoder(type_name)) for field, type_name in fields
+            )
+            for name, fields in self.fields.items()
+        }
+
+    def _dependencies(self, primary_type: str, found: set) -> set:
+        if primary_type in found or primary_type not in self.fields:
+            return found
+        found.add(primary_type)
+        for _, type_name in self.fields[primary_type]:
+            array = _ARRAY_TYPE.match(type_name)
+            while array:
+                type_name = array.group(1)
+                array = _ARRAY_TYPE.match(type_name)
+            self._dependencies(type_name, found)
+        return found
+
+    def encode_type(self, primary_type: str) -> str:
+        """
+        Args:
+            primary_type: the name of a struct type
+        Returns:
+            Returns the EIP-712 type string, with referenced struct types appended in name order
+        """
+        if primary_type not in self.fields:
+            raise SimbaMessageException(f"Unknown type: {primary_type}")
+        dependencies = self._dependencies(primary_type, set())
+        dependencies.discard(primary_type)
+        return "".join(
+            name
+            + "("
+            + ",".join(f"{type_name} {field}" for field, type_name in self.fields[name])
+            + ")"
+            for name in [primary_type] + sorted(dependencies)
+        )
+
+    def _encoder(self, type_name: str) -> Callable:
+        encoder = self._encoders.get(type_name)
+        if encoder is None:
+            encoder = self._encoders[type_name] = self._build_encoder(type_name)
+        return encoder
+
+    def _build_encoder(self, type_name: str) -> Callable:
+        if type_name in self.fields:
+            return lambda value: self.hash_struct(type_name, value)
+        array = _ARRAY_TYPE.match(type_name)
+        if array:
+            item_type, length = array.group(1), array.group(2)
+            length = int(length) if length else None
+
+            def encode_array(value) -> bytes:
+                if not isinstance(value, (list, tuple)) or (
+                    length is not None and len(value) != length
+                ):
+                    raise SimbaMessageException(
+                        f"Invalid value for {type_name}: {value!r}"
+                    )
+                encode_item = self._encoder(item_type)
+                return _keccak(b"".join(encode_item(item) for item in value))
+
+            return encode_array
+        if type_name == "address":
+            return _encode_address
+        if type_name == "bool":
+            return _encode_bool
+        if type_name == "string":
+            return _encode_string
+        if type_name == "bytes":
+            return _encode_dynamic_bytes
+        integer = _INT_TYPE.match(type_name)
+        if integer:
+            bits = int(integer.group(2) or 256)
+            if bits % 8 or not 0 < bits <= 256:
+                raise SimbaMessageException(f"Unknown type: {type_name}")
+            return _int_encoder(not integer.group(1), bits, type_name)
+        fixed_bytes = _BYTES_TYPE.match(type_name)
+        if fixed_bytes and 0 < int(fixed_bytes.group(1)) <= 32:
+            return _bytes_encoder(int(fixed_bytes.group(1)), type_name)
+        raise SimbaMessageException(f"Unknown type: {type_name}")
+
+    def hash_struct(self, primary_type: str, data: dict) -> bytes:
+        """
+        Args:
+            primary_type: the name of a struct type
+            data: the struct value
+        Returns:
+            Returns the EIP-712 hashStruct of the value
+        """
+        try:
+            field_encoders = self._field_encoders[primary_type]
+        except (KeyError, TypeError):
+            raise SimbaMessageException(f"Unknown type: {primary_type}")
+        if not isinstance(data, dict):
+            raise SimbaMessageException(f"Invalid value for {primary_type}: {data!r}")
+        encoded = [self.type_hashes[primary_type]]
+        for field, encode in field_encoders:
+            try:
+                value = data[field]
+            except KeyError:
+                raise SimbaMessageException(
+                    f"Missing field in {primary_type}: '{field}'"
+                )
+            encoded.append(encode(value))
+        return _keccak(b"".join(encoded))
+
+
+def _canonical(value) -> str:
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=lambda item: f"0x{bytes(item).hex()}",
+    )
+
+
+@lru_cache(maxsize=128)
+def _compile_schema(canonical_types: str) -> TypedDataSchema:
+    return TypedDataSchema(json.loads(canonical_types))
+
+
+def compile_schema(types: Dict[str, List[dict]]) -> TypedDataSchema:
+    """
+    The compiled schema for a set of struct types, memoized per schema
+
+    Args:
+        types: the struct types, as in the "types" member of EIP-712 typed data
+    Returns:
+        Returns the compiled schema
+    """
+    try:
+        return _compile_schema(_canonical(types))
+    except (TypeError, ValueError) as exc:
+        raise SimbaMessageException(f"Invalid types: {exc}")
+
+
+@lru_cache(maxsize=128)
+def _domain_separator(canonical_domain: str) -> bytes:
+    domain_types, domain = json.loads(canonical_domain)
+    return compile_schema({"EIP712Domain": domain_types}).hash_struct(
+        "EIP712Domain", domain
+    )
+
+
+def domain_separator(domain: dict, domain_types: List[dict] = None) -> bytes:
+    """
+    The EIP-712 domain separator, memoized per domain
+
+    Args:
+        domain: the domain, as in the "domain" member of EIP-712 typed data
+        domain_types: the fields of EIP712Domain. If not set, they are inferred from
+                      the members of the domain.
+    Returns:
+        Returns the domain separator
+    """
+    if not isinstance(domain, dict):
+        raise SimbaMessageException(f"Invalid domain: {domain!r}")
+    if domain_types is None:
+        domain_types = [
+            {"name": name, "type": type_name}
+            for name, type_name in DOMAIN_FIELDS
+            if name in domain
+        ]
+    try:
+        return _domain_separator(_canonical([domain_types, domain]))
+    except (TypeError, ValueError) as exc:
+        raise SimbaMessageException(f"Invalid domain: {exc}")
+
+
+def typed_data_hash(typed_data: dict) -> bytes:
+    """
+    The EIP-712 digest to sign for typed data
+
+    Args:
+        typed_data: a dict with "types", "primaryType", "domain" and "message" members
+    Returns:
+        Returns keccak256("\\x19\\x01" + domainSeparator + hashStruct(message))
+    """
+    if not isinstance(typed_data, dict):
+        raise SimbaMessageException(f"Invalid typed data: {typed_data!r}")
+    try:
+        types = typed_data["types"]
+        primary_type = typed_data["primaryType"]
+        domain = typed_data["domain"]
+        message = typed_data["message"]
+    except KeyError as exc:
+        raise SimbaMessageException(f"Missing field in typed data: {exc}")
+    if not isinstance(types, dict):
+        raise SimbaMessageException(f"Invalid types: {types!r}")
+    if not isinstance(primary_type, str):
+        raise SimbaMessageException(f"Invalid primaryType: {primary_type!r}")
+    if not isinstance(domain, dict):
+        raise SimbaMessageException(f"Invalid domain: {domain!r}")
+    return _keccak(
+        b"\x19\x01"
+        + domain_separator(domain, types.get("EIP712Domain"))
+        + compile_schema(types).hash_struct(primary_type, message)
+    )
+
+
+def personal_message_hash(message: Message) -> bytes:
+    """
+    The EIP-191 digest to sign for a message, as for eth_sign and personal_sign
+
+    Args:
+        message: the message, as text or bytes
+    Returns:
+        Returns keccak256("\\x19Ethereum Signed Message:\\n" + len(message) + message)
+    """
+    if isinstance(message, str):
+        message = message.encode("utf-8")
+    elif isinstance(message, (bytearray, memoryview)):
+        message = bytes(message)
+    elif not isinstance(message, bytes):
+        raise SimbaMessageException(f"Invalid message: {message!r}")
+    return _keccak(b"\x19Ethereum Signed Message:\n%d%s" % (len(message), message))
+
+
+def message_hash(payload: Union[Message, dict]) -> bytes:
+    """
+    The digest to sign for a payload
+
+    Args:
+        payload: EIP-712 typed data as a dict, or an EIP-191 message as text or bytes
+    Returns:
+        Returns the digest
+    """
+    if isinstance(payload, dict):
+        return typed_data_hash(payload)
+    return personal_message_hash(payload)
+
+
+def sign_message_hash(digest: bytes, private_key: "PrivateKey") -> dict:
+    """
+    Sign a digest produced by message_hash
+
+    Args:
+        digest: the 32 byte digest
+        private_key: the signing key
+    Returns:
+        Returns a dict with the hex encoded messageHash and signature, and r, s and v
+    """
+    signature = private_key.sign_msg_hash(digest)
+    v = signature.v + 27
+    return {
+        "messageHash": f"0x{digest.hex()}",
+        "r": signature.r,
+        "s": signature.s,
+        "v": v,
+        "signature": f"0x{signature.r:064x}{signature.s:064x}{v:02x}",
+    }
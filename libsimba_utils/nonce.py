@@ -0,0 +1,168 @@
+import heapq
+import threading
+
+from typing import Dict, List, Optional, Tuple, Union
+
+from libsimba_utils.exceptions import SimbaNonceException
+
+
+ChainId = Optional[Union[int, str]]
+
+
+def normalize_chain_id(chain_id: ChainId) -> Optional[int]:
+    """
+    Normalize a chain id as found in transaction payloads, e.g., "0x1", "1" or 1, to an int
+
+    Args:
+        chain_id: the chain id, or None for transactions without one
+    Returns:
+        Returns the chain id as an int, or None
+    """
+    if chain_id is None or isinstance(chain_id, int):
+        return chain_id
+    try:
+        return int(chain_id, 16) if chain_id.startswith("0x") else int(chain_id)
+    except (AttributeError, ValueError):
+        raise SimbaNonceException(f"Invalid chain id: {chain_id!r}")
+
+
+class _NonceState:
+    __slots__ = ("floor", "next_nonce", "released")
+
+    def __init__(self, next_nonce: int):
+        # the seeded nonce. Lower nonces were used before seeding, so they are never released.
+        self.floor = next_nonce
+        self.next_nonce = next_nonce
+        self.released: List[int] = []
+
+
+class NonceManager:
+    """
+    Hands out transaction nonces locally, per (address, chainId), so that many
+    transactions can be signed ahead of submission without asking the network.
+    All methods are safe to call from multiple threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._accounts: Dict[Tuple[str, Optional[int]], _NonceState] = {}
+
+    @staticmethod
+    def _key(address: str, chain_id: ChainId) -> Tuple[str, Optional[int]]:
+        return address.lower(), normalize_chain_id(chain_id)
+
+    def seed(self, address: str, chain_id: ChainId, nonce: int):
+        """
+        Set the next nonce for an address, e.g., from the transaction count on chain.
+        Any released nonces for the address are discarded.
+
+        Args:
+            address: the sending address
+            chain_id: the chain the transactions are for
+            nonce: the next nonce to hand out
+        """
+        if nonce < 0:
+            raise SimbaNonceException(f"Invalid nonce: {nonce}")
+        with self._lock:
+            self._accounts[self._key(address, chain_id)] = _NonceState(nonce)
+
+    def is_seeded(self, address: str, chain_id: ChainId) -> bool:
+        """
+        Has the address been seeded for the chain?
+
+        Returns:
+            Returns a boolean indicating if nonces can be allocated
+        """
+        with self._lock:
+            return self._key(address, chain_id) in self._accounts
+
+    def allocate(self, address: str, chain_id: ChainId) -> int:
+        """
+        Allocate a nonce. Released nonces are reused, lowest first,
+        before new nonces are handed out.
+
+        Args:
+            address: the sending address
+            chain_id: the chain the transaction is for
+        Returns:
+            Returns the nonce to sign with
+        """
+        key = self._key(address, chain_id)
+        with self._lock:
+            state = self._accounts.get(key)
+            if state is None:
+                raise SimbaNonceException(
+                    f"No nonce seeded for {key[0]} on chain {key[1]}"
+                )
+            if state.released:
+                return heapq.heappop(state.released)
+            nonce = state.next_nonce
+            state.next_nonce += 1
+            return nonce
+
+    def release(self, address: str, chain_id: ChainId, nonce: int):
+        """
+        Return an allocated nonce that was not used, e.g., after a failed submit,
+        so that the gap is filled by the next allocation.
+
+        Args:
+            address: the sending address
+            chain_id: the chain the transaction was for
+            nonce: the unused nonce
+        """
+        key = self._key(address, chain_id)
+        with self._lock:
+            state = self._accounts.get(key)
+            if state is None:
+                raise SimbaNonceException(
+                    f"No nonce seeded for {key[0]} on chain {key[1]}"
+                )
+            if (
+                nonce < state.floor
+                or nonce >= state.next_nonce
+                or nonce in state.released
+            ):
+                raise SimbaNonceException(f"Nonce {nonce} is not allocated")
+            if nonce == state.next_nonce - 1:
+                state.next_nonce -= 1
+                # collapse released nonces that now sit at the top of the range
+                while state.next_nonce - 1 in state.released:
+                    state.released.remove(state.next_nonce - 1)
+                    state.next_nonce -= 1
+                heapq.heapify(state.released)
+            else:
+                heapq.heappush(state.released, nonce)
+
+    def peek(self, address: str, chain_id: ChainId) -> int:
+        """
+        The nonce the next call to allocate will return, without allocating it.
+
+        Args:
+            address: the sending address
+            chain_id: the chain the transaction is for
+        Returns:
+            Returns the next nonce
+        """
+        key = self._key(address, chain_id)
+        with self._lock:
+            state = self._accounts.get(key)
+            if state is None:
+                raise SimbaNonceException(
+                    f"No nonce seeded for {key[0]} on chain {key[1]}"
+                )
+            return state.released[0] if state.released else state.next_nonce
+
+    def reset(self, address: str = None, chain_id: ChainId = None):
+        """
+        Forget the nonce state for an address on a chain, or for every address if
+        no address is given.
+
+        Args:
+            address: the sending address
+            chain_id: the chain to forget
+        """
+        with self._lock:
+            if address is None:
+                self._accounts.clear()
+            else:
+                self._accounts.pop(self._key(address, chain_id), None)
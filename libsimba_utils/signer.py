@@ -0,0 +1,618 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import threading
+
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+from libsimba_utils import exceptions
+from libsimba_utils.exceptions import (
+    SimbaSignerException,
+    SimbaTransactionException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.instrumentation import MetricsSink
+from libsimba_utils.messages import Message
+from libsimba_utils.transaction import (
+    OUTPUT_DICT,
+    OUTPUT_RAW,
+    SignedTransaction,
+    check_output,
+)
+from libsimba_utils.wallet_base import WalletBase
+from libsimba_utils.wallet_pool import WalletPool
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+# Frames are a 4 byte big endian length followed by a UTF-8 JSON object.
+# Requests:  {"id": int, "op": str, "address": str or null, "payload": ...}
+# Responses: {"id": int, "result": ...} or {"id": int, "error": {"type": str, "message": str}}
+# Responses on a connection may arrive out of order, they are matched by id.
+HEADER_SIZE = 4
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+OP_ADDRESS = "address"
+OP_SIGN = "sign"
+OP_SIGN_TRANSACTION = "sign_transaction"
+SIGNING_OPS = (OP_SIGN, OP_SIGN_TRANSACTION)
+
+
+def _encode_value(value) -> str:
+    # bytes nested in payloads, such as EIP-712 bytes fields, are sent as 0x hex
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"0x{bytes(value).hex()}"
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _frame(message: dict) -> bytes:
+    body = json.dumps(message, separators=(",", ":"), default=_encode_value)
+    body = body.encode("utf-8")
+    return len(body).to_bytes(HEADER_SIZE, "big") + body
+
+
+def _bind(path: str) -> socket.socket:
+    """
+    Bind a Unix domain socket at path, readable and writable by the owner only.
+    A stale socket left by a server that exited is replaced, anything else at the
+    path is left alone.
+
+    Args:
+        path: the path of the socket
+    Returns:
+        Returns the bound socket, not yet listening
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(mode):
+            raise SimbaSignerException(f"{path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise SimbaSignerException(f"A signer is already serving at {path}")
+        finally:
+            probe.close()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+        # the server holds keys, so restrict the socket before it accepts connections
+        os.chmod(path, 0o600)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _error(exc: Exception) -> dict:
+    return {"type": type(exc).__name__, "message": str(exc)}
+
+
+_worker_pool: Optional[WalletPool] = None
+
+
+def _init_worker(pool: WalletPool) -> None:
+    global _worker_pool
+    _worker_pool = pool
+
+
+def _sign_jobs(jobs: List[tuple], pool: WalletPool = None) -> List[dict]:
+    """
+    Sign a batch of jobs, in a worker process or in the server process
+
+    Args:
+        jobs: (op, address, payload) tuples
+        pool: the wallet pool, or None to use the pool of the worker process
+    Returns:
+        Returns a response body without id for every job, in order
+    """
+    if pool is None:
+        pool = _worker_pool
+    responses = []
+    for op, address, payload in jobs:
+        try:
+            if op == OP_SIGN_TRANSACTION:
+                result = pool.sign_transaction(address, payload)
+            else:
+                result = pool.sign(address, payload)
+            responses.append({"result": result})
+        except Exception as exc:
+            responses.append({"error": _error(exc)})
+    return responses
+
+
+class SignerServer:
+    """
+    A local signing daemon. It holds signing keys once in a WalletPool and serves
+    signing requests from many processes over a Unix domain socket. Requests arriving
+    close together are coalesced into batches, which are split across a pool of
+    worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool: WalletPool,
+        workers: int = None,
+        max_batch: int = 64,
+        batch_delay: float = 0.001,
+        metrics: MetricsSink = None,
+    ):
+        """
+        Args:
+            path: the path of the Unix domain socket
+            pool: the identities to sign with. Identities must be added before the server starts.
+            workers: the number of worker processes to sign with. If not set, or less than 2,
+                     batches are signed in a thread of the server process.
+            max_batch: the maximum number of requests in a batch
+            batch_delay: how long to wait, in seconds, for more requests to join a batch
+            metrics: if set, receives the signer.requests and signer.batches counters
+        """
+        self.path = path
+        self.pool = pool
+        self.workers = workers if workers and workers >= 2 else None
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self.metrics = metrics
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._default_address: Optional[str] = None
+        self._writers = set()
+
+    def start(self):
+        """
+        Serve in a background thread. Returns once the socket is accepting connections.
+        """
+        if self._thread is not None:
+            raise SimbaSignerException("The signer server is already running")
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            try:
+                asyncio.run(self._serve(ready))
+            except Exception as exc:
+                failure.append(exc)
+                ready.set()
+
+        self._thread = threading.Thread(target=run, name="signer-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            self._thread = None
+            raise failure[0]
+
+    def stop(self):
+        """
+        Stop a server started with start, and remove the socket
+        """
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join()
+        self._thread = None
+
+    def serve_forever(self):
+        """
+        Serve in the current thread until the process is interrupted
+        """
+        asyncio.run(self._serve(threading.Event()))
+
+    def __enter__(self) -> "SignerServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _executor(self) -> "Executor":
+        if self.workers is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            return ThreadPoolExecutor(max_workers=1)
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.pool,)
+        )
+
+    async def _serve(self, ready: threading.Event):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        addresses = list(self.pool.addresses())
+        self._default_address = addresses[0] if len(addresses) == 1 else None
+        queue = asyncio.Queue()
+        sock = _bind(self.path)
+        inode = os.stat(self.path).st_ino
+        with self._executor() as executor:
+            batcher = asyncio.ensure_future(self._batch(queue, executor))
+            server = await asyncio.start_unix_server(
+                lambda reader, writer: self._handle(reader, writer, queue),
+                sock=sock,
+            )
+            try:
+                ready.set()
+                await self._stopped.wait()
+            finally:
+                server.close()
+                for writer in list(self._writers):
+                    writer.close()
+                await server.wait_closed()
+                batcher.cancel()
+                try:
+                    if os.lstat(self.path).st_ino == inode:
+                        os.unlink(self.path)
+                except FileNotFoundError:
+                    pass
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        queue: asyncio.Queue,
+    ):
+        write_lock = asyncio.Lock()
+        pending = set()
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER_SIZE)
+                    size = int.from_bytes(header, "big")
+                    if size > MAX_FRAME_SIZE:
+                        break
+                    body = await reader.readexactly(size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                task = asyncio.ensure_future(
+                    self._respond(body, writer, write_lock, queue)
+                )
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(
+        self,
+        body: bytes,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+        queue: asyncio.Queue,
+    ):
+        request_id = None
+        try:
+            request = json.loads(body)
+            request_id = request.get("id")
+            op = request.get("op")
+            address = request.get("address") or self._default_address
+            if op not in SIGNING_OPS and op != OP_ADDRESS:
+                raise SimbaSignerException(f"Unknown operation: {op}")
+            if address is None:
+                raise SimbaWalletNotFoundException(
+                    "No address given and the signer holds more than one identity"
+                )
+            if op == OP_ADDRESS:
+                if address not in self.pool:
+                    raise SimbaWalletNotFoundException(
+                        f"No wallet for address {address}"
+                    )
+                response = {"result": address}
+            else:
+                payload = request.get("payload")
+                if request.get("bytes"):
+                    payload = bytes.fromhex(payload)
+                future = self._loop.create_future()
+                queue.put_nowait(((op, address, payload), future))
+                response = await future
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            response = {"error": _error(exc)}
+        response["id"] = request_id
+        try:
+            async with write_lock:
+                writer.write(_frame(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _batch(self, queue: asyncio.Queue, executor: "Executor"):
+        """
+        Coalesce queued requests into batches and sign them in the executor
+        """
+        chunks = self.workers or 1
+        # bound the chunks in flight, so the queue applies back pressure
+        in_flight = asyncio.Semaphore(2 * chunks)
+        while True:
+            batch = [await queue.get()]
+            deadline = self._loop.time() + self.batch_delay
+            while len(batch) < self.max_batch:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if self.metrics is not None:
+                self.metrics.increment("signer.batches")
+                self.metrics.increment("signer.requests", len(batch))
+
+            chunk_size = -(-len(batch) // chunks)
+            for start in range(0, len(batch), chunk_size):
+                chunk = batch[start : start + chunk_size]
+                await in_flight.acquire()
+                signed = self._loop.run_in_executor(
+                    executor,
+                    _sign_jobs,
+                    [job for job, _ in chunk],
+                    None if self.workers else self.pool,
+                )
+                signed.add_done_callback(
+                    lambda signed, chunk=chunk: self._resolve(chunk, signed, in_flight)
+                )
+
+    @staticmethod
+    def _resolve(
+        chunk: List[tuple], signed: asyncio.Future, in_flight: asyncio.Semaphore
+    ):
+        in_flight.release()
+        if signed.cancelled():
+            responses = [{"error": _error(SimbaSignerException("Signing cancelled"))}]
+            responses *= len(chunk)
+        elif signed.exception() is not None:
+            responses = [{"error": _error(signed.exception())}] * len(chunk)
+        else:
+            responses = signed.result()
+        for (_, future), response in zip(chunk, responses):
+            if not future.done():
+                future.set_result(dict(response))
+
+
+class SignerClient(WalletBase):
+    """
+    A wallet that signs through a SignerServer, so many processes can share the keys
+    held by one server. Requests of the batch methods are pipelined over one connection.
+    """
+
+    def __init__(self, path: str, address: str = None, timeout: float = None):
+        """
+        Args:
+            path: the path of the server's Unix domain socket
+            address: the identity to sign with. Required if the server holds more than one.
+            timeout: the socket timeout in seconds. If not set, calls block until answered.
+        """
+        super().__init__()
+        self.path = path
+        self.address = address
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._resolved_address: Optional[str] = None
+
+    def close(self):
+        """
+        Close the connection to the server
+        """
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self) -> "SignerClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connection(self) -> socket.socket:
+        # a connection inherited over fork would be shared with the parent
+        if self._socket is None or self._pid != os.getpid():
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.path)
+            except OSError as exc:
+                connection.close()
+                raise SimbaSignerException(
+                    f"Cannot connect to signer at {self.path}: {exc}"
+                )
+            self._socket = connection
+            self._pid = os.getpid()
+        return self._socket
+
+    def _read_exactly(self, connection: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Connection closed by the signer")
+            data += chunk
+        return bytes(data)
+
+    def _call_many(self, requests: List[dict]) -> List[dict]:
+        """
+        Send requests in one write and wait for all responses
+
+        Args:
+            requests: the requests, without ids
+        Returns:
+            Returns the responses in the order of the requests
+        """
+        if not requests:
+            return []
+        with self._lock:
+            connection = self._connection()
+            ids = []
+            frames = []
+            responses = {}
+            for request in requests:
+                self._next_id += 1
+                ids.append(self._next_id)
+                try:
+                    frames.append(_frame({**request, "id": self._next_id}))
+                except (TypeError, ValueError) as exc:
+                    error = SimbaSignerException(f"Invalid payload: {exc}")
+                    responses[self._next_id] = {"error": _error(error)}
+            try:
+                if frames:
+                    connection.sendall(b"".join(frames))
+                while len(responses) < len(requests):
+                    size = int.from_bytes(
+                        self._read_exactly(connection, HEADER_SIZE), "big"
+                    )
+                    response = json.loads(self._read_exactly(connection, size))
+                    responses[response.get("id")] = response
+            except OSError as exc:
+                self.close()
+                raise SimbaSignerException(f"Signer request failed: {exc}")
+        return [responses[request_id] for request_id in ids]
+
+    @staticmethod
+    def _result(response: dict):
+        """
+        The result of a response, or the exception the server raised for the request
+        """
+        if "error" not in response:
+            return response["result"]
+        error = response["error"]
+        exception_type = getattr(exceptions, error.get("type", ""), None)
+        if not isinstance(exception_type, type) or not issubclass(
+            exception_type, Exception
+        ):
+            exception_type = SimbaSignerException
+        return exception_type(error.get("message"))
+
+    def _request(self, op: str, payload=None) -> dict:
+        request = {"op": op, "address": self.address, "payload": payload}
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            request["payload"] = bytes(payload).hex()
+            request["bytes"] = True
+        return request
+
+    def _call(self, op: str, payload=None):
+        result = self._result(self._call_many([self._request(op, payload)])[0])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def wallet_exists(self) -> bool:
+        """
+        Does the server hold the identity of this client?
+
+        Returns:
+            Returns a boolean indicating if a wallet exist.
+        """
+        try:
+            self.get_address()
+        except SimbaWalletNotFoundException:
+            return False
+        return True
+
+    def get_address(self):
+        """
+        The address associated with this wallet
+
+        Returns:
+            Returns the address associated with this wallet
+        """
+        if self._resolved_address is None:
+            self._resolved_address = self._call(OP_ADDRESS)
+        return self._resolved_address
+
+    def sign_transaction(
+        self, payload: dict, output: str = OUTPUT_DICT
+    ) -> Union[dict, SignedTransaction]:
+        """
+        Sign the transaction payload with the wallet
+
+        Args:
+            payload: a transaction object
+            output: "dict" or "raw", as for Wallet.sign_transaction
+        Returns:
+            Returns the signed transaction
+        """
+        check_output(output)
+        return _to_output(self._call(OP_SIGN_TRANSACTION, payload), output)
+
+    def sign_transactions(
+        self, payloads: Sequence[dict], output: str = OUTPUT_DICT
+    ) -> List[Union[dict, SignedTransaction, SimbaTransactionException]]:
+        """
+        Sign a batch of transaction payloads with the wallet
+
+        Args:
+            payloads: a sequence of transaction objects
+            output: "dict" or "raw", as for Wallet.sign_transaction
+        Returns:
+            Returns a list in the same order as the payloads. Each entry is either
+            the signed transaction, or the exception raised for that payload.
+        """
+        check_output(output)
+        responses = self._call_many(
+            [self._request(OP_SIGN_TRANSACTION, payload) for payload in payloads]
+        )
+        results = []
+        for response in responses:
+            result = self._result(response)
+            results.append(
+                result if isinstance(result, Exception) else _to_output(result, output)
+            )
+        return results
+
+    def sign(self, payload: Union[Message, dict]) -> dict:
+        """
+        Sign an EIP-191 message or EIP-712 typed data with the wallet
+
+        Args:
+            payload: the message or typed data, as for Wallet.sign
+        Returns:
+            Returns the signature, as for Wallet.sign
+        """
+        return self._call(OP_SIGN, payload)
+
+    def sign_messages(
+        self, payloads: Sequence[Union[Message, dict]]
+    ) -> List[Union[dict, Exception]]:
+        """
+        Sign a batch of messages or typed data with the wallet
+
+        Args:
+            payloads: a sequence of payloads, as for Wallet.sign
+        Returns:
+            Returns a list in the same order as the payloads. Each entry is either
+            the signature, or the exception raised for that payload.
+        """
+        responses = self._call_many(
+            [self._request(OP_SIGN, payload) for payload in payloads]
+        )
+        return [self._result(response) for response in responses]
+
+
+def _to_output(signed: dict, output: str) -> Union[dict, SignedTransaction]:
+    if output != OUTPUT_RAW:
+        return signed
+    return SignedTransaction(
+        bytes.fromhex(signed["rawTransaction"][2:]),
+        bytes.fromhex(signed["hash"][2:]),
+        signed["r"],
+        signed["s"],
+        signed["v"],
+    )
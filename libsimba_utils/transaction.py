@@ -0,0 +1,327 @@
+from typing import TYPE_CHECKING, Optional, Union
+
+from libsimba_utils import keccak
+from libsimba_utils.exceptions import SimbaTransactionException
+
+
+if TYPE_CHECKING:
+    from eth_keys.datatypes import PrivateKey
+
+
+EIP1559_TYPE = b"\x02"
+
+# output formats of signed transactions
+OUTPUT_DICT = "dict"
+OUTPUT_RAW = "raw"
+OUTPUT_FORMATS = (OUTPUT_DICT, OUTPUT_RAW)
+
+
+def _rlp_length_prefix(length: int, offset: int) -> bytes:
+    if length < 56:
+        return bytes([offset + length])
+    encoded_length = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([offset + 55 + len(encoded_length)]) + encoded_length
+
+
+def rlp_encode_bytes(value: bytes) -> bytes:
+    """
+    RLP encode a byte string
+    """
+    if len(value) == 1 and value[0] < 0x80:
+        return value
+    return _rlp_length_prefix(len(value), 0x80) + value
+
+
+def rlp_encode_int(value: int) -> bytes:
+    """
+    RLP encode an unsigned integer, as a big endian byte string without leading zeros
+    """
+    if value == 0:
+        return b"\x80"
+    return rlp_encode_bytes(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+
+
+def rlp_encode_list(encoded_items: bytes) -> bytes:
+    """
+    RLP encode a list, given the concatenation of its already encoded items
+    """
+    return _rlp_length_prefix(len(encoded_items), 0xC0) + encoded_items
+
+
+def to_int(value: Union[int, str], field: str) -> int:
+    """
+    Convert a transaction field given as an int or a 0x prefixed hex string to an int.
+    Like eth_account, strings without the prefix are rejected rather than read as hex.
+    """
+    try:
+        if isinstance(value, str):
+            if value[:2].lower() != "0x":
+                raise ValueError(value)
+            value = int(value[2:], 16)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise ValueError(value)
+    except ValueError:
+        raise SimbaTransactionException(f"Invalid value for {field}: {value!r}")
+    return value
+
+
+def to_bytes(value: Union[str, bytes], field: str) -> bytes:
+    """
+    Convert a transaction field given as bytes or a hex string to bytes
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    try:
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    except (AttributeError, ValueError):
+        raise SimbaTransactionException(f"Invalid value for {field}: {value!r}")
+
+
+def check_output(output: str):
+    """
+    Validate a signed transaction output format
+    """
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format {output!r}, expected one of {OUTPUT_FORMATS}"
+        )
+
+
+class SignedTransaction:
+    """
+    A signed transaction holding the raw transaction and its hash as bytes. Hex
+    representations are only computed when asked for, so binary submit paths
+    do not pay for hex encoding.
+    """
+
+    __slots__ = (
+        "raw_transaction",
+        "hash",
+        "r",
+        "s",
+        "v",
+        "nonce",
+        "_raw_transaction_hex",
+        "_hash_hex",
+    )
+
+    def __init__(
+        self,
+        raw_transaction: bytes,
+        hash: bytes,
+        r: int,
+        s: int,
+        v: int,
+        nonce: Optional[int] = None,
+    ):
+        self.raw_transaction = raw_transaction
+        self.hash = hash
+        self.r = r
+        self.s = s
+        self.v = v
+        self.nonce = nonce
+        self._raw_transaction_hex: Optional[str] = None
+        self._hash_hex: Optional[str] = None
+
+    @property
+    def raw_transaction_hex(self) -> str:
+        if self._raw_transaction_hex is None:
+            self._raw_transaction_hex = f"0x{self.raw_transaction.hex()}"
+        return self._raw_transaction_hex
+
+    @property
+    def hash_hex(self) -> str:
+        if self._hash_hex is None:
+            self._hash_hex = f"0x{self.hash.hex()}"
+        return self._hash_hex
+
+    def to_dict(self) -> dict:
+        """
+        The signed transaction in the format returned by Wallet.sign_transaction by default
+
+        Returns:
+            Returns a dict with hex encoded rawTransaction and hash
+        """
+        signed = {
+            "rawTransaction": self.raw_transaction_hex,
+            "hash": self.hash_hex,
+            "r": self.r,
+            "s": self.s,
+            "v": self.v,
+        }
+        if self.nonce is not None:
+            signed["nonce"] = self.nonce
+        return signed
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SignedTransaction):
+            return NotImplemented
+        return (self.raw_transaction, self.nonce) == (
+            other.raw_transaction,
+            other.nonce,
+        )
+
+    def __repr__(self) -> str:
+        return f"SignedTransaction(hash={self.hash_hex}, nonce={self.nonce})"
+
+    def __getstate__(self):
+        return (self.raw_transaction, self.hash, self.r, self.s, self.v, self.nonce)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+def with_nonce(
+    signed: Union[dict, SignedTransaction], nonce: Optional[int]
+) -> Union[dict, SignedTransaction]:
+    """
+    Record an allocated nonce on a signed transaction
+    """
+    if nonce is not None:
+        if isinstance(signed, SignedTransaction):
+            signed.nonce = nonce
+        else:
+            signed["nonce"] = nonce
+    return signed
+
+
+class PreparedTransaction:
+    """
+    A transaction template whose fixed fields are validated and RLP encoded once.
+    Signing only encodes the fields that vary, i.e., the nonce and optionally the value
+    or the end of the call data, hashes the result and signs the hash.
+    Signatures are identical to Wallet.sign_transaction for the same payload.
+    """
+
+    __slots__ = (
+        "_private_key",
+        "chain_id",
+        "legacy",
+        "data",
+        "value",
+        "_before_nonce",
+        "_before_value",
+        "_encoded_value",
+        "_encoded_data",
+        "_after_data",
+    )
+
+    def __init__(self, payload: dict, private_key: "PrivateKey"):
+        """
+        Args:
+            payload: a transaction object as accepted by Wallet.sign_transaction.
+                     A nonce in the payload is ignored, it is given to sign.
+            private_key: the key to sign with
+        """
+        self._private_key = private_key
+        try:
+            to = to_bytes(payload["to"], "to")
+            gas = to_int(payload["gas"], "gas")
+            self.data = to_bytes(payload["data"], "data")
+            self.value = to_int(payload.get("value", 0), "value")
+            self.chain_id = (
+                to_int(payload["chainId"], "chainId")
+                if payload.get("chainId")
+                else None
+            )
+            self.legacy = bool(payload.get("gasPrice"))
+            if self.legacy:
+                fees = rlp_encode_int(to_int(payload["gasPrice"], "gasPrice"))
+            else:
+                fees = rlp_encode_int(
+                    to_int(payload["maxPriorityFeePerGas"], "maxPriorityFeePerGas")
+                ) + rlp_encode_int(to_int(payload["maxFeePerGas"], "maxFeePerGas"))
+        except KeyError as exc:
+            raise SimbaTransactionException(f"Missing field in transaction: {exc}")
+        # an empty to creates a contract
+        if len(to) not in (0, 20):
+            raise SimbaTransactionException(f"Invalid value for to: {payload['to']!r}")
+
+        self._before_value = fees + rlp_encode_int(gas) + rlp_encode_bytes(to)
+        self._encoded_value = rlp_encode_int(self.value)
+        self._encoded_data = rlp_encode_bytes(self.data)
+        if self.legacy:
+            self._before_nonce = b""
+            # EIP-155 replay protection appends the chain id and two empty values
+            self._after_data = (
+                rlp_encode_int(self.chain_id) + b"\x80\x80" if self.chain_id else b""
+            )
+        else:
+            if self.chain_id is None:
+                raise SimbaTransactionException(
+                    "Missing field in transaction: 'chainId'"
+                )
+            self._before_nonce = rlp_encode_int(self.chain_id)
+            # empty access list
+            self._after_data = b"\xc0"
+
+    def sign(
+        self,
+        nonce: Union[int, str],
+        value: Union[int, str] = None,
+        data: Union[str, bytes] = None,
+        data_suffix: Union[str, bytes] = None,
+        output: str = OUTPUT_DICT,
+    ) -> Union[dict, SignedTransaction]:
+        """
+        Sign the transaction with the given nonce
+
+        Args:
+            nonce: the transaction nonce
+            value: overrides the value of the template
+            data: overrides the call data of the template
+            data_suffix: appended to the call data of the template, e.g., a varying argument
+            output: "dict" for a dict of hex strings, as Wallet.sign_transaction returns,
+                    or "raw" for a SignedTransaction holding bytes
+        Returns:
+            Returns the signed transaction
+        """
+        check_output(output)
+        if value is None:
+            encoded_value = self._encoded_value
+        else:
+            encoded_value = rlp_encode_int(to_int(value, "value"))
+        if data is None and data_suffix is None:
+            encoded_data = self._encoded_data
+        else:
+            data = self.data if data is None else to_bytes(data, "data")
+            if data_suffix is not None:
+                data += to_bytes(data_suffix, "data_suffix")
+            encoded_data = rlp_encode_bytes(data)
+
+        fields = (
+            self._before_nonce
+            + rlp_encode_int(to_int(nonce, "nonce"))
+            + self._before_value
+            + encoded_value
+            + encoded_data
+        )
+        if self.legacy:
+            unsigned = rlp_encode_list(fields + self._after_data)
+        else:
+            unsigned = EIP1559_TYPE + rlp_encode_list(fields + self._after_data)
+        signature = self._private_key.sign_msg_hash(keccak.new(256, unsigned).digest())
+        r, s = signature.r, signature.s
+
+        if not self.legacy:
+            v = signature.v
+            signed_fields = fields + self._after_data
+        elif self.chain_id:
+            v = signature.v + 35 + 2 * self.chain_id
+            signed_fields = fields
+        else:
+            v = signature.v + 27
+            signed_fields = fields
+        signed_fields += rlp_encode_int(v) + rlp_encode_int(r) + rlp_encode_int(s)
+        raw = rlp_encode_list(signed_fields)
+        if not self.legacy:
+            raw = EIP1559_TYPE + raw
+        if output == OUTPUT_RAW:
+            return SignedTransaction(raw, keccak.new(256, raw).digest(), r, s, v)
+        return {
+            "rawTransaction": f"0x{raw.hex()}",
+            "hash": f"0x{keccak.new(256, raw).hexdigest()}",
+            "r": r,
+            "s": s,
+            "v": v,
+        }
@@ -1,6 +1,9 @@
-from typing import List, Tuple, Union
+import os
 
-from Crypto.Hash import keccak
+from typing import BinaryIO, Dict, Iterable, List, Tuple, Union
+
+from libsimba_utils import keccak
+from libsimba_utils.keccak import Hashable
 
 
 def convert_to_bytes32_array(
@@ -31,52 +34,218 @@ def convert_to_bytes32_array(
 
 
 def convert_bytes32_to_string(
-    bytes32_array: Union[List, Tuple, str], length: int = None
+    bytes32_array: Union[List, Tuple, str, bytes, bytearray, memoryview],
+    length: int = None,
 ) -> str:
     """
     Convert a bytes32 in hex representation or an array of
     bytes32 in hex representation to a string.
-    The representations are assumed to
+    Raw bytes, or an array of raw bytes32 values, are also accepted and skip hex decoding.
+    The chunks are joined and decoded in a single pass.
     :param bytes32_array: the array of bytes or byte arrays
     :param length: The length of the array to convert if input is an array.
            If none, defaults to the length of the input array.
+           For raw bytes input, the number of 32 byte slots to convert.
     :return: a string
     """
     if isinstance(bytes32_array, (list, tuple)):
-        if length is None:
-            length = len(bytes32_array)
-        byte_array = bytearray(32 * length)
-        for i in range(0, length):
-            offset = 2 if bytes32_array[i].startswith("0x") else 0
-            chunk = bytearray.fromhex(bytes32_array[i][offset:])
-            byte_array[i * 32 :] = chunk
-        bs = byte_array.decode("utf8")
-    else:
+        if length is not None:
+            bytes32_array = bytes32_array[:length]
+        if bytes32_array and not isinstance(bytes32_array[0], str):
+            raw = b"".join(bytes32_array)
+        else:
+            raw = bytes.fromhex(
+                "".join(
+                    chunk[2:] if chunk.startswith("0x") else chunk
+                    for chunk in bytes32_array
+                )
+            )
+    elif isinstance(bytes32_array, str):
         offset = 2 if bytes32_array.startswith("0x") else 0
-        chunk = bytearray.fromhex(bytes32_array[offset:])
-        bs = chunk.decode("utf8")
-    return bs.strip("\u0000")
+        raw = bytes.fromhex(bytes32_array[offset:])
+    else:
+        raw = bytes(bytes32_array if length is None else bytes32_array[: 32 * length])
+    return raw.strip(b"\x00").decode("utf8")
 
 
-def keccak_hash(value: str, bits: int = 256, as_hex: bool = True) -> Union[str, bytes]:
+def keccak_hash(
+    value: Hashable, bits: int = 256, as_hex: bool = True
+) -> Union[str, bytes]:
     """
     HAsh a value.
-    :param value: the value to hash
+    :param value: the value to hash. Strings are UTF-8 encoded, bytes-like values are hashed as is.
     :param bits: the numver of bits - default is 256
     :param as_hex: whether to return a hex digest or the raw bytes
     :return:
     """
-    k_hash = keccak.new(digest_bits=bits).update(value.encode("utf-8"))
+    k_hash = keccak.new(bits, value)
     if as_hex:
         return k_hash.hexdigest()
     else:
         return k_hash.digest()
 
 
-def string_to_uint256(value: str, big_endian: bool = True) -> int:
+def keccak_hash_many(
+    values: Iterable[Hashable], bits: int = 256, as_hex: bool = True
+) -> List[Union[str, bytes]]:
+    """
+    Hash many values in one call.
+    :param values: the values to hash. Strings are UTF-8 encoded, bytes-like values are hashed as is.
+    :param bits: the number of bits - default is 256
+    :param as_hex: whether to return hex digests or the raw bytes
+    :return: a list of digests in the order of the values
+    """
+    new = keccak.new
+    if as_hex:
+        return [new(bits, value).hexdigest() for value in values]
+    return [new(bits, value).digest() for value in values]
+
+
+# read size for streams and the span hashed per call for memory maps
+HASH_CHUNK_SIZE = 1024 * 1024
+
+FilePath = Union[str, os.PathLike]
+
+
+def _digest(k_hash, as_hex: bool) -> Union[str, bytes]:
+    return k_hash.hexdigest() if as_hex else k_hash.digest()
+
+
+def keccak_hash_stream(
+    stream: BinaryIO,
+    bits: int = 256,
+    as_hex: bool = True,
+    chunk_size: int = HASH_CHUNK_SIZE,
+) -> Union[str, bytes]:
+    """
+    Hash the rest of a binary stream, reading it in chunks.
+    :param stream: a binary file-like object
+    :param bits: the number of bits - default is 256
+    :param as_hex: whether to return a hex digest or the raw bytes
+    :param chunk_size: the number of bytes read at a time
+    :return: the digest, as for keccak_hash
+    """
+    k_hash = keccak.new(bits)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    readinto = getattr(stream, "readinto", None)
+    while True:
+        if readinto is not None:
+            read = readinto(buffer)
+            if not read:
+                break
+            k_hash.update(view[:read])
+        else:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            k_hash.update(chunk)
+    return _digest(k_hash, as_hex)
+
+
+def keccak_hash_file(
+    path: FilePath,
+    bits: int = 256,
+    as_hex: bool = True,
+    use_mmap: bool = True,
+    chunk_size: int = HASH_CHUNK_SIZE,
+) -> Union[str, bytes]:
+    """
+    Hash the contents of a file without loading it into memory.
+    :param path: the path of the file
+    :param bits: the number of bits - default is 256
+    :param as_hex: whether to return a hex digest or the raw bytes
+    :param use_mmap: whether to hash through a memory map, which avoids copying the file
+           into Python buffers. If False, or the file cannot be mapped, it is read in chunks.
+    :param chunk_size: the number of bytes hashed at a time
+    :return: the digest, as for keccak_hash
+    """
+    with open(path, "rb") as stream:
+        if use_mmap:
+            import mmap
+
+            try:
+                mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # empty files and special files cannot be mapped
+                mapped = None
+            if mapped is not None:
+                k_hash = keccak.new(bits)
+                with mapped, memoryview(mapped) as view:
+                    for offset in range(0, len(view), chunk_size):
+                        k_hash.update(view[offset : offset + chunk_size])
+                return _digest(k_hash, as_hex)
+        return keccak_hash_stream(stream, bits, as_hex, chunk_size)
+
+
+def keccak_hash_files(
+    paths: Iterable[FilePath],
+    bits: int = 256,
+    as_hex: bool = True,
+    workers: int = None,
+    use_mmap: bool = True,
+) -> List[Union[str, bytes]]:
+    """
+    Hash many files in parallel. The keccak backends release the GIL while hashing,
+    so a thread pool keeps several cores and disk reads busy without pickling.
+    :param paths: the paths of the files
+    :param bits: the number of bits - default is 256
+    :param as_hex: whether to return hex digests or the raw bytes
+    :param workers: the number of worker threads. If not set, the executor default is used.
+           1 hashes the files in the current thread.
+    :param use_mmap: whether to hash through memory maps, as for keccak_hash_file
+    :return: a list of digests in the order of the paths
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) < 2:
+        return [keccak_hash_file(path, bits, as_hex, use_mmap) for path in paths]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                lambda path: keccak_hash_file(path, bits, as_hex, use_mmap), paths
+            )
+        )
+
+
+def keccak_hash_directory(
+    directory: FilePath,
+    bits: int = 256,
+    as_hex: bool = True,
+    workers: int = None,
+    use_mmap: bool = True,
+) -> Dict[str, Union[str, bytes]]:
+    """
+    Hash every file under a directory, recursively, in parallel.
+    :param directory: the path of the directory
+    :param bits: the number of bits - default is 256
+    :param as_hex: whether to return hex digests or the raw bytes
+    :param workers: the number of worker threads, as for keccak_hash_files
+    :param use_mmap: whether to hash through memory maps, as for keccak_hash_file
+    :return: a dict from file path, relative to the directory and using "/" separators,
+             to digest, in path order
+    """
+    relative_paths = sorted(
+        os.path.relpath(os.path.join(root, name), directory).replace(os.sep, "/")
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+    digests = keccak_hash_files(
+        (os.path.join(directory, path) for path in relative_paths),
+        bits,
+        as_hex,
+        workers,
+        use_mmap,
+    )
+    return dict(zip(relative_paths, digests))
+
+
+def string_to_uint256(value: Hashable, big_endian: bool = True) -> int:
     """
     Convert any length string to an unsigned 256 bit integer via hashing
-    :param value: The string value to convert
+    :param value: The string value to convert. Bytes-like values are hashed as is.
     :param big_endian: whether to use big or little endian byte order. Solidity keccak uses big.
     :return: an integer
     """
@@ -86,3 +255,19 @@ def string_to_uint256(value: str, big_endian: bool = True) -> int:
         if big_endian
         else (int.from_bytes(hash_val, byteorder="little", signed=False))
     )
+
+
+def strings_to_uint256(
+    values: Iterable[Hashable], big_endian: bool = True
+) -> List[int]:
+    """
+    Convert many strings to unsigned 256 bit integers via hashing
+    :param values: the values to convert
+    :param big_endian: whether to use big or little endian byte order. Solidity keccak uses big.
+    :return: a list of integers in the order of the values
+    """
+    byteorder = "big" if big_endian else "little"
+    return [
+        int.from_bytes(digest, byteorder=byteorder, signed=False)
+        for digest in keccak_hash_many(values, as_hex=False)
+    ]
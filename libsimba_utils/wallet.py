@@ -1,28 +1,141 @@
 import binascii
+import time
 
-from hdwallet import BIP44HDWallet
-from hdwallet.cryptocurrencies import EthereumMainnet
-from hdwallet.utils import generate_mnemonic
-from web3.auto import w3
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
 
 from libsimba_utils.exceptions import (
+    SimbaKeystoreException,
+    SimbaMessageException,
     SimbaMnemonicException,
+    SimbaNonceException,
     SimbaPrivateKeyException,
     SimbaTransactionException,
     SimbaWalletNotFoundException,
 )
+from libsimba_utils.instrumentation import MetricsSink, RecordingMetricsSink
+from libsimba_utils.keystore import (
+    Keystore,
+    UnlockCache,
+    encrypt_keystore,
+    unlock_keystore,
+    unlock_keystores,
+)
+from libsimba_utils.messages import Message, message_hash, sign_message_hash
+from libsimba_utils.nonce import NonceManager
+from libsimba_utils.transaction import (
+    OUTPUT_DICT,
+    OUTPUT_RAW,
+    PreparedTransaction,
+    SignedTransaction,
+    check_output,
+    with_nonce,
+)
 from libsimba_utils.wallet_base import WalletBase
 
 
+# hdwallet, eth_account and eth_keys are imported where they are first used
+# so that importing this module stays cheap for short-lived processes.
+if TYPE_CHECKING:
+    from eth_keys.datatypes import PrivateKey
+
+
 class Wallet(WalletBase):
-    def unlock_wallet(self, passkey: str):
+    def __init__(
+        self,
+        nonce_manager: NonceManager = None,
+        keystore: Keystore = None,
+        unlock_cache: Optional[UnlockCache] = None,
+    ):
         """
-        Unlock the wallet with the given passkey
+        Args:
+            nonce_manager: if set, payloads signed without a nonce are given one from
+                           the manager, and the allocated nonce is added to the result.
+            keystore: an encrypted JSON keystore for unlock_wallet, as a dict, a JSON string,
+                      or the path of a keystore file.
+            unlock_cache: caches recently unlocked keystores so the KDF does not run on every
+                          unlock. Not set by default, as the cache keeps unlocked private keys
+                          in plaintext until they expire, even after delete_wallet.
+        """
+        super().__init__()
+        self.nonce_manager = nonce_manager
+        self.keystore = keystore
+        self.unlock_cache = unlock_cache
+        self._signing_key: Optional["PrivateKey"] = None
+
+    @property
+    def wallet(self):
+        return self._wallet
+
+    @wallet.setter
+    def wallet(self, wallet):
+        # the signing key is derived from the wallet, so it must not outlive it
+        self._wallet = wallet
+        self._signing_key = None
+
+    def unlock_wallet(self, passkey: str, keystore: Keystore = None):
+        """
+        Unlock the wallet with the given passkey. Set self.wallet to the wallet in the keystore.
 
         Args:
             passkey: used to unlock the wallet
+            keystore: the encrypted JSON keystore to unlock. Defaults to self.keystore.
+        """
+        if keystore is None:
+            keystore = self.keystore
+        if keystore is None:
+            raise SimbaKeystoreException("No keystore to unlock")
+        private_key = unlock_keystore(keystore, passkey, self.unlock_cache)
+        self.generate_from_private_key(private_key.hex())
+
+    @staticmethod
+    def unlock_wallets(
+        keystores: Sequence[Keystore],
+        passkeys: Union[str, Sequence[str]],
+        workers: int = None,
+        unlock_cache: Optional[UnlockCache] = None,
+    ) -> List[Union["Wallet", SimbaKeystoreException]]:
+        """
+        Unlock many keystores, running the KDFs in parallel across worker processes
+
+        Args:
+            keystores: the encrypted JSON keystores to unlock
+            passkeys: one passkey for all keystores, or one passkey per keystore
+            workers: the number of worker processes. If not set, or less than 2,
+                     the keystores are decrypted in the current process.
+            unlock_cache: the unlock cache, or None to always run the KDF
+        Returns:
+            Returns a list in the same order as the keystores. Each entry is either
+            an unlocked wallet, or the SimbaKeystoreException raised for that keystore.
         """
-        pass
+        results = []
+        for private_key in unlock_keystores(keystores, passkeys, workers, unlock_cache):
+            if isinstance(private_key, SimbaKeystoreException):
+                results.append(private_key)
+                continue
+            wallet = Wallet(unlock_cache=unlock_cache)
+            wallet.generate_from_private_key(private_key.hex())
+            results.append(wallet)
+        return results
+
+    def export_keystore(
+        self, passkey: str, kdf: str = "scrypt", iterations: int = None
+    ) -> dict:
+        """
+        Encrypt the private key of the wallet into a JSON keystore
+
+        Args:
+            passkey: the passkey to encrypt with
+            kdf: the key derivation function, "scrypt" or "pbkdf2"
+            iterations: the KDF work factor, i.e., n for scrypt or the iteration count for pbkdf2
+        Returns:
+            Returns the keystore as a dict
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        return encrypt_keystore(
+            self.wallet.private_key(), passkey, kdf=kdf, iterations=iterations
+        )
 
     def generate_from_mnemonic(self, mnemonic: str = None):
         """
@@ -31,6 +144,10 @@ class Wallet(WalletBase):
         Args:
             mnemonic: A string the wallet will use to create the wallet
         """
+        from hdwallet import BIP44HDWallet
+        from hdwallet.cryptocurrencies import EthereumMainnet
+        from hdwallet.utils import generate_mnemonic
+
         wallet: BIP44HDWallet = BIP44HDWallet(cryptocurrency=EthereumMainnet)
 
         if not mnemonic:
@@ -47,6 +164,7 @@ class Wallet(WalletBase):
         wallet.clean_derivation()
 
         self.wallet = wallet
+        self._signing_key = _signing_key(wallet.private_key())
 
     def generate_from_private_key(self, private_key):
         """
@@ -55,6 +173,9 @@ class Wallet(WalletBase):
         Args:
             mnemonic: A string the wallet will use to create the wallet
         """
+        from hdwallet import BIP44HDWallet
+        from hdwallet.cryptocurrencies import EthereumMainnet
+
         wallet: BIP44HDWallet = BIP44HDWallet(cryptocurrency=EthereumMainnet)
 
         try:
@@ -66,6 +187,7 @@ class Wallet(WalletBase):
         wallet.clean_derivation()
 
         self.wallet = wallet
+        self._signing_key = _signing_key(wallet.private_key())
 
     def delete_wallet(self):
         """
@@ -82,52 +204,277 @@ class Wallet(WalletBase):
         """
         return self.wallet is not None
 
-    def sign_transaction(self, payload: dict) -> dict:
+    def sign_transaction(
+        self, payload: dict, output: str = OUTPUT_DICT
+    ) -> Union[dict, SignedTransaction]:
         """
         Sign the transaction payload with the wallet
 
         Args:
             payload: a transaction object
+            output: "dict" for a dict with hex encoded rawTransaction and hash,
+                    or "raw" for a SignedTransaction holding bytes
+        Returns:
+            Returns the signed transaction
+        """
+        check_output(output)
+        metrics = self.metrics
+        if metrics is None:
+            return self._sign_transaction(payload, output)
+        try:
+            signed = self._sign_transaction(payload, output, metrics)
+        except Exception as exc:
+            metrics.increment(
+                "sign_transaction.failed", tags={"exception": type(exc).__name__}
+            )
+            raise
+        metrics.increment("sign_transaction.signed")
+        return signed
+
+    def _sign_transaction(
+        self, payload: dict, output: str, metrics: MetricsSink = None
+    ) -> Union[dict, SignedTransaction]:
+        """
+        Sign the transaction payload with the wallet, timing each stage if there is a metrics sink
+
+        Args:
+            payload: a transaction object
+            output: the output format
+            metrics: the metrics sink, or None
         Returns:
             Returns the signed transaction
         """
         if not self.wallet_exists():
             raise SimbaWalletNotFoundException("No wallet loaded!")
 
+        payload, nonce = self._allocate_nonce(payload)
         try:
-            transaction_template = {
-                "to": bytes.fromhex(payload["to"][2:]),
-                "value": payload.get("value", 0),
-                "gas": payload["gas"],
-                "data": bytes.fromhex(payload["data"][2:]),
-                "nonce": payload["nonce"],
-            }
-            if payload.get("chainId"):
-                transaction_template["chainId"] = payload["chainId"]
-            if payload.get("gasPrice"):
-                # legacy transaction
-                transaction_template["gasPrice"] = payload["gasPrice"]
+            if metrics is None:
+                signed = _sign_payload(payload, self._get_signing_key(), output)
             else:
-                # EIP 1559 transaction
-                transaction_template["maxPriorityFeePerGas"] = payload["maxPriorityFeePerGas"]
-                transaction_template["maxFeePerGas"] = payload["maxFeePerGas"]
-        except KeyError as exc:
-            raise SimbaTransactionException(f"Missing field in transaction: {exc}")
+                start = time.perf_counter()
+                signing_key = self._get_signing_key()
+                metrics.timing("sign_transaction.key", time.perf_counter() - start)
+                signed = _sign_payload(payload, signing_key, output, metrics)
+        except SimbaTransactionException:
+            self._release_nonce(payload, nonce)
+            raise
+        return with_nonce(signed, nonce)
+
+    def sign_transactions(
+        self,
+        payloads: Sequence[dict],
+        workers: Optional[int] = None,
+        output: str = OUTPUT_DICT,
+    ) -> List[Union[dict, SignedTransaction, SimbaTransactionException]]:
+        """
+        Sign a batch of transaction payloads with the wallet
+
+        Args:
+            payloads: a sequence of transaction objects
+            workers: the number of worker processes to sign with. If not set, or
+                     less than 2, the batch is signed in the current process.
+            output: "dict" or "raw", as for sign_transaction
+        Returns:
+            Returns a list in the same order as the payloads. Each entry is either
+            the signed transaction, or the SimbaTransactionException raised for that payload.
+        """
+        check_output(output)
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        allocated = self._allocate_nonces(payloads)
+        payloads = [payload for payload, _ in allocated]
+        nonces = [nonce for _, nonce in allocated]
+        # payloads whose nonce could not be allocated are not signed
+        pending = [
+            index
+            for index, payload in enumerate(payloads)
+            if not isinstance(payload, Exception)
+        ]
+        results = list(payloads)
+        if not workers or workers < 2 or len(pending) < 2:
+            signing_key = self._get_signing_key()
+            for index in pending:
+                results[index] = _sign_payload_or_error(
+                    payloads[index], signing_key, output
+                )
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(pending) // (workers * 4))
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.wallet.private_key(),),
+            ) as executor:
+                signed = executor.map(
+                    _sign_in_worker,
+                    [payloads[index] for index in pending],
+                    [output] * len(pending),
+                    chunksize=chunksize,
+                )
+                for index, result in zip(pending, signed):
+                    results[index] = result
+
+        # release in reverse so trailing unused nonces are handed back contiguously
+        for payload, nonce, result in reversed(list(zip(payloads, nonces, results))):
+            if isinstance(result, SimbaTransactionException):
+                self._release_nonce(payload, nonce)
+            else:
+                with_nonce(result, nonce)
+        if self.metrics is not None:
+            failed = [result for result in results if isinstance(result, Exception)]
+            for result in failed:
+                self.metrics.increment(
+                    "sign_transaction.failed", tags={"exception": type(result).__name__}
+                )
+            if len(results) > len(failed):
+                self.metrics.increment(
+                    "sign_transaction.signed", len(results) - len(failed)
+                )
+        return results
+
+    def sign(self, payload: Union[Message, dict]) -> dict:
+        """
+        Sign an EIP-191 message or EIP-712 typed data with the wallet.
+        EIP-712 domain separators and type hashes are memoized, so signing many
+        messages against the same domain only hashes the message values.
+
+        Args:
+            payload: a dict with "types", "primaryType", "domain" and "message" members
+                     for typed data, or the message as text or bytes
+        Returns:
+            Returns a dict with the hex encoded messageHash and signature, and r, s and v
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        return _sign_message(payload, self._get_signing_key())
+
+    def sign_messages(
+        self,
+        payloads: Sequence[Union[Message, dict]],
+        workers: Optional[int] = None,
+    ) -> List[Union[dict, SimbaMessageException]]:
+        """
+        Sign a batch of messages or typed data with the wallet
+
+        Args:
+            payloads: a sequence of payloads, as for sign
+            workers: the number of worker processes to sign with. If not set, or
+                     less than 2, the batch is signed in the current process.
+        Returns:
+            Returns a list in the same order as the payloads. Each entry is either
+            the signature, or the SimbaMessageException raised for that payload.
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
 
-        private_key = self.wallet.private_key()
+        if not workers or workers < 2 or len(payloads) < 2:
+            signing_key = self._get_signing_key()
+            return [
+                _sign_message_or_error(payload, signing_key) for payload in payloads
+            ]
 
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(payloads) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.wallet.private_key(),),
+        ) as executor:
+            return list(
+                executor.map(_sign_message_in_worker, payloads, chunksize=chunksize)
+            )
+
+    def prepare_transaction(self, payload: dict) -> PreparedTransaction:
+        """
+        Validate and encode the fixed fields of a transaction once, for signing it
+        repeatedly with different nonces
+
+        Args:
+            payload: a transaction object without a nonce
+        Returns:
+            Returns a prepared transaction bound to the key of this wallet
+        """
+        if not self.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+
+        return PreparedTransaction(payload, self._get_signing_key())
+
+    def _allocate_nonce(self, payload: dict) -> Tuple[dict, Optional[int]]:
+        """
+        Fill in the nonce of a payload from the nonce manager, if there is one
+        and the payload has no nonce.
+
+        Args:
+            payload: a transaction object
+        Returns:
+            Returns the payload to sign and the allocated nonce, or None if no nonce was allocated
+        """
+        if self.nonce_manager is None or "nonce" in payload:
+            return payload, None
+        nonce = self.nonce_manager.allocate(self.get_address(), payload.get("chainId"))
+        return {**payload, "nonce": nonce}, nonce
+
+    def _allocate_nonces(
+        self, payloads: Sequence[dict]
+    ) -> List[Tuple[Union[dict, SimbaTransactionException], Optional[int]]]:
+        """
+        Fill in the nonces of a batch of payloads. A payload whose nonce cannot be
+        allocated is replaced by the SimbaTransactionException for it, so the rest
+        of the batch can still be signed.
+
+        Args:
+            payloads: a sequence of transaction objects
+        Returns:
+            Returns the payload to sign, or the exception, and the allocated nonce for each payload
+        """
+        allocated = []
         try:
-            signed = w3.eth.account.sign_transaction(transaction_template, private_key)
-        except TypeError as exc:
-            raise SimbaTransactionException(f"Invalid transaction provided: {exc}")
-
-        return {
-            "rawTransaction": signed.rawTransaction.hex(),
-            "hash": signed.hash.hex(),
-            "r": signed.r,
-            "s": signed.s,
-            "v": signed.v,
-        }
+            for payload in payloads:
+                try:
+                    allocated.append(self._allocate_nonce(payload))
+                except (SimbaNonceException, AttributeError, TypeError) as exc:
+                    allocated.append(
+                        (
+                            SimbaTransactionException(
+                                f"Invalid transaction provided: {exc}"
+                            ),
+                            None,
+                        )
+                    )
+        except BaseException:
+            for payload, nonce in reversed(allocated):
+                self._release_nonce(payload, nonce)
+            raise
+        return allocated
+
+    def _release_nonce(self, payload: dict, nonce: Optional[int]):
+        """
+        Hand an allocated nonce back to the nonce manager after signing failed
+
+        Args:
+            payload: the transaction object the nonce was allocated for
+            nonce: the allocated nonce, or None if no nonce was allocated
+        """
+        if nonce is not None:
+            self.nonce_manager.release(
+                self.get_address(), payload.get("chainId"), nonce
+            )
+
+    def _get_signing_key(self) -> "PrivateKey":
+        """
+        The signing key for the current wallet, derived once and reused for every signature
+
+        Returns:
+            Returns the signing key of the current wallet
+        """
+        if self._signing_key is None:
+            self._signing_key = _signing_key(self.wallet.private_key())
+        return self._signing_key
 
     def get_address(self):
         """
@@ -140,3 +487,145 @@ class Wallet(WalletBase):
             raise SimbaWalletNotFoundException("No wallet loaded!")
 
         return self.wallet.address()
+
+
+_worker_private_key = None
+
+
+def _build_transaction(payload: dict) -> dict:
+    try:
+        transaction_template = {
+            "to": bytes.fromhex(payload["to"][2:]),
+            "value": payload.get("value", 0),
+            "gas": payload["gas"],
+            "data": bytes.fromhex(payload["data"][2:]),
+            "nonce": payload["nonce"],
+        }
+        if payload.get("chainId"):
+            transaction_template["chainId"] = payload["chainId"]
+        if payload.get("gasPrice"):
+            # legacy transaction
+            transaction_template["gasPrice"] = payload["gasPrice"]
+        else:
+            # EIP 1559 transaction
+            transaction_template["maxPriorityFeePerGas"] = payload[
+                "maxPriorityFeePerGas"
+            ]
+            transaction_template["maxFeePerGas"] = payload["maxFeePerGas"]
+    except KeyError as exc:
+        raise SimbaTransactionException(f"Missing field in transaction: {exc}")
+    except (TypeError, ValueError) as exc:
+        raise SimbaTransactionException(f"Invalid transaction provided: {exc}")
+    return transaction_template
+
+
+def _signing_key(private_key: str) -> "PrivateKey":
+    from eth_keys import keys
+
+    return keys.PrivateKey(bytes.fromhex(private_key))
+
+
+def _sign_template(transaction_template: dict, private_key: "PrivateKey"):
+    from eth_account import Account
+    from eth_utils.exceptions import ValidationError
+    from rlp.exceptions import RLPException
+
+    try:
+        return Account.sign_transaction(transaction_template, private_key)
+    except (TypeError, ValueError, ValidationError, RLPException) as exc:
+        # eth_account validates field formats, rlp rejects e.g. negative integers
+        raise SimbaTransactionException(f"Invalid transaction provided: {exc}")
+
+
+def _format_signed(signed, output: str = OUTPUT_DICT) -> Union[dict, SignedTransaction]:
+    if output == OUTPUT_RAW:
+        return SignedTransaction(
+            bytes(signed.rawTransaction),
+            bytes(signed.hash),
+            signed.r,
+            signed.s,
+            signed.v,
+        )
+    return {
+        "rawTransaction": signed.rawTransaction.hex(),
+        "hash": signed.hash.hex(),
+        "r": signed.r,
+        "s": signed.s,
+        "v": signed.v,
+    }
+
+
+def _sign_payload(
+    payload: dict,
+    private_key: "PrivateKey",
+    output: str = OUTPUT_DICT,
+    metrics: MetricsSink = None,
+) -> Union[dict, SignedTransaction]:
+    if metrics is None:
+        return _format_signed(
+            _sign_template(_build_transaction(payload), private_key), output
+        )
+
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    transaction_template = _build_transaction(payload)
+    parsed = perf_counter()
+    metrics.timing("sign_transaction.parse", parsed - start)
+    signed = _sign_template(transaction_template, private_key)
+    signed_at = perf_counter()
+    metrics.timing("sign_transaction.sign", signed_at - parsed)
+    result = _format_signed(signed, output)
+    metrics.timing("sign_transaction.serialize", perf_counter() - signed_at)
+    return result
+
+
+def _sign_payload_timed(
+    payload: dict, private_key: "PrivateKey", output: str = OUTPUT_DICT
+) -> Tuple[Union[dict, SignedTransaction], List[Tuple[str, float]]]:
+    # for executors, where the caller's metrics sink is not available
+    recorder = RecordingMetricsSink()
+    signed = _sign_payload(payload, private_key, output, recorder)
+    return signed, [
+        (name, seconds)
+        for name, durations in recorder.timings.items()
+        for seconds in durations
+    ]
+
+
+def _sign_payload_or_error(
+    payload: dict, private_key: "PrivateKey", output: str = OUTPUT_DICT
+) -> Union[dict, SignedTransaction, SimbaTransactionException]:
+    try:
+        return _sign_payload(payload, private_key, output)
+    except SimbaTransactionException as exc:
+        return exc
+
+
+def _init_worker(private_key: str) -> None:
+    global _worker_private_key
+    _worker_private_key = _signing_key(private_key)
+
+
+def _sign_in_worker(
+    payload: dict, output: str = OUTPUT_DICT
+) -> Union[dict, SignedTransaction, SimbaTransactionException]:
+    return _sign_payload_or_error(payload, _worker_private_key, output)
+
+
+def _sign_message(payload: Union[Message, dict], private_key: "PrivateKey") -> dict:
+    return sign_message_hash(message_hash(payload), private_key)
+
+
+def _sign_message_or_error(
+    payload: Union[Message, dict], private_key: "PrivateKey"
+) -> Union[dict, SimbaMessageException]:
+    try:
+        return _sign_message(payload, private_key)
+    except SimbaMessageException as exc:
+        return exc
+
+
+def _sign_message_in_worker(
+    payload: Union[Message, dict]
+) -> Union[dict, SimbaMessageException]:
+    return _sign_message_or_error(payload, _worker_private_key)
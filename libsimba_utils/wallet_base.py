@@ -3,6 +3,8 @@ class WalletBase:
 
     def __init__(self):
         self.wallet = None
+        # an optional libsimba_utils.instrumentation.MetricsSink
+        self.metrics = None
 
     def unlock_wallet(self, passkey):
         """
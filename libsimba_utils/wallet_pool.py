@@ -0,0 +1,211 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Union
+
+from libsimba_utils.derivation import SECP256K1_N
+from libsimba_utils.exceptions import (
+    SimbaPrivateKeyException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.messages import Message, message_hash, sign_message_hash
+from libsimba_utils.transaction import OUTPUT_DICT, SignedTransaction, check_output
+from libsimba_utils.wallet import _sign_payload, _signing_key
+
+
+if TYPE_CHECKING:
+    from eth_keys.datatypes import PrivateKey
+
+    from libsimba_utils.wallet import Wallet
+
+
+KEY_SIZE = 32
+ADDRESS_SIZE = 20
+
+
+def _canonical_address(address: Union[str, bytes]) -> bytes:
+    if isinstance(address, bytes):
+        return address
+    try:
+        return bytes.fromhex(address[2:] if address.startswith("0x") else address)
+    except (AttributeError, ValueError):
+        raise SimbaWalletNotFoundException(f"No wallet for address {address!r}")
+
+
+class WalletPool:
+    """
+    Holds many signing identities compactly. Private keys are packed into a single
+    bytearray, 32 bytes per identity, with a dict from address to slot for lookups.
+    Key objects for recently used identities are kept in a small LRU cache, because
+    building one costs about as much as a signature.
+    """
+
+    __slots__ = ("_keys", "_addresses", "_index", "_key_cache", "key_cache_size")
+
+    def __init__(self, key_cache_size: int = 128):
+        """
+        Args:
+            key_cache_size: the number of signing key objects to keep for recently used
+                            identities. 0 disables the cache.
+        """
+        self._keys = bytearray()
+        self._addresses = bytearray()
+        self._index: Dict[bytes, int] = {}
+        self._key_cache: "OrderedDict[bytes, PrivateKey]" = OrderedDict()
+        self.key_cache_size = key_cache_size
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, address: Union[str, bytes]) -> bool:
+        try:
+            return _canonical_address(address) in self._index
+        except SimbaWalletNotFoundException:
+            return False
+
+    def add_private_key(self, private_key: Union[str, bytes]) -> str:
+        """
+        Add an identity to the pool. Adding a key that is already in the pool has no effect.
+
+        Args:
+            private_key: the private key as 32 bytes or in hex representation
+        Returns:
+            Returns the address of the identity
+        """
+        from eth_keys.exceptions import ValidationError
+
+        try:
+            if isinstance(private_key, str):
+                private_key = bytes.fromhex(
+                    private_key[2:] if private_key.startswith("0x") else private_key
+                )
+            if not 0 < int.from_bytes(private_key, "big") < SECP256K1_N:
+                raise ValueError("Private key out of range")
+            signing_key = _signing_key(private_key.hex())
+        except (ValueError, ValidationError):
+            raise SimbaPrivateKeyException("Invalid private key")
+        address = signing_key.public_key.to_canonical_address()
+        if address not in self._index:
+            self._index[address] = len(self._index)
+            self._keys += private_key
+            self._addresses += address
+        return signing_key.public_key.to_checksum_address()
+
+    def add_private_keys(self, private_keys: Iterable[Union[str, bytes]]):
+        """
+        Add many identities to the pool
+
+        Args:
+            private_keys: the private keys as 32 bytes or in hex representation
+        """
+        for private_key in private_keys:
+            self.add_private_key(private_key)
+
+    def add_wallet(self, wallet: "Wallet") -> str:
+        """
+        Add the identity of a loaded wallet to the pool
+
+        Args:
+            wallet: the wallet
+        Returns:
+            Returns the address of the identity
+        """
+        if not wallet.wallet_exists():
+            raise SimbaWalletNotFoundException("No wallet loaded!")
+        return self.add_private_key(wallet.wallet.private_key())
+
+    def remove(self, address: Union[str, bytes]):
+        """
+        Remove an identity from the pool. The last identity is moved into the freed slot.
+
+        Args:
+            address: the address of the identity
+        """
+        address = _canonical_address(address)
+        slot = self._slot(address)
+        last = len(self._index) - 1
+        if slot != last:
+            last_address = bytes(self._addresses[last * ADDRESS_SIZE :])
+            self._keys[slot * KEY_SIZE : (slot + 1) * KEY_SIZE] = self._keys[
+                last * KEY_SIZE :
+            ]
+            self._addresses[
+                slot * ADDRESS_SIZE : (slot + 1) * ADDRESS_SIZE
+            ] = last_address
+            self._index[last_address] = slot
+        del self._keys[last * KEY_SIZE :]
+        del self._addresses[last * ADDRESS_SIZE :]
+        del self._index[address]
+        self._key_cache.pop(address, None)
+
+    def addresses(self) -> Iterator[str]:
+        """
+        The addresses of the identities in the pool
+
+        Returns:
+            Returns a generator of checksum addresses
+        """
+        from eth_utils import to_checksum_address
+
+        for slot in range(len(self._index)):
+            yield to_checksum_address(
+                self._addresses[slot * ADDRESS_SIZE : (slot + 1) * ADDRESS_SIZE]
+            )
+
+    def _slot(self, address: bytes) -> int:
+        try:
+            return self._index[address]
+        except KeyError:
+            raise SimbaWalletNotFoundException(
+                f"No wallet for address 0x{address.hex()}"
+            )
+
+    def _get_signing_key(self, address: Union[str, bytes]) -> "PrivateKey":
+        """
+        The signing key for an identity, from the cache if it was used recently
+
+        Args:
+            address: the address of the identity
+        Returns:
+            Returns the signing key
+        """
+        address = _canonical_address(address)
+        signing_key = self._key_cache.get(address)
+        if signing_key is not None:
+            self._key_cache.move_to_end(address)
+            return signing_key
+        slot = self._slot(address)
+        signing_key = _signing_key(
+            self._keys[slot * KEY_SIZE : (slot + 1) * KEY_SIZE].hex()
+        )
+        if self.key_cache_size > 0:
+            self._key_cache[address] = signing_key
+            if len(self._key_cache) > self.key_cache_size:
+                self._key_cache.popitem(last=False)
+        return signing_key
+
+    def sign_transaction(
+        self, address: Union[str, bytes], payload: dict, output: str = OUTPUT_DICT
+    ) -> Union[dict, SignedTransaction]:
+        """
+        Sign the transaction payload with the identity for an address
+
+        Args:
+            address: the address of the identity
+            payload: a transaction object
+            output: "dict" or "raw", as for Wallet.sign_transaction
+        Returns:
+            Returns the signed transaction
+        """
+        check_output(output)
+        return _sign_payload(payload, self._get_signing_key(address), output)
+
+    def sign(self, address: Union[str, bytes], payload: Union[Message, dict]) -> dict:
+        """
+        Sign an EIP-191 message or EIP-712 typed data with the identity for an address
+
+        Args:
+            address: the address of the identity
+            payload: the message or typed data, as for Wallet.sign
+        Returns:
+            Returns the signature, as for Wallet.sign
+        """
+        return sign_message_hash(message_hash(payload), self._get_signing_key(address))
@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from libsimba_utils.async_wallet import AsyncWallet
+from libsimba_utils.exceptions import (
+    SimbaMessageException,
+    SimbaMnemonicException,
+    SimbaTransactionException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.instrumentation import RecordingMetricsSink
+from libsimba_utils.nonce import NonceManager
+from libsimba_utils.wallet import Wallet
+
+
+PRIVATE_KEY = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+    "nonce": "0x2",
+}
+EXPECTED_HASH = "0x616452f0874117edf0bf0c2f39f13d16a83748814f681efdc573431fc5088fb6"
+
+
+class TestAsyncWallet(unittest.IsolatedAsyncioTestCase):
+    async def test_generate_from_mnemonic(self):
+        wallet = AsyncWallet()
+        mnemonic = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+        await wallet.generate_from_mnemonic(mnemonic)
+        self.assertEqual(wallet.wallet.mnemonic(), mnemonic)
+        sync_wallet = Wallet()
+        sync_wallet.generate_from_mnemonic(mnemonic)
+        self.assertEqual(wallet.get_address(), sync_wallet.get_address())
+
+    async def test_generate_from_mnemonic_invalid(self):
+        wallet = AsyncWallet()
+        with pytest.raises(SimbaMnemonicException):
+            await wallet.generate_from_mnemonic("invalid")
+        self.assertFalse(wallet.wallet_exists())
+
+    async def test_sign_transaction(self):
+        wallet = AsyncWallet(max_concurrency=2)
+        await wallet.generate_from_private_key(PRIVATE_KEY)
+        signature = await wallet.sign_transaction(PAYLOAD)
+        self.assertEqual(signature["hash"], EXPECTED_HASH)
+        wallet.delete_wallet()
+        with pytest.raises(SimbaWalletNotFoundException):
+            await wallet.sign_transaction(PAYLOAD)
+
+    async def test_sign_transactions(self):
+        nonce_manager = NonceManager()
+        wallet = AsyncWallet(max_concurrency=2, nonce_manager=nonce_manager)
+        await wallet.generate_from_private_key(PRIVATE_KEY)
+        nonce_manager.seed(wallet.get_address(), 1, 2)
+        payload = {key: value for key, value in PAYLOAD.items() if key != "nonce"}
+        signatures = await wallet.sign_transactions([payload, {"chainId": 1}, payload])
+        self.assertEqual(signatures[0]["hash"], EXPECTED_HASH)
+        self.assertIsInstance(signatures[1], SimbaTransactionException)
+        self.assertEqual(signatures[2]["nonce"], 4)
+        # the nonce allocated to the failed payload is handed out next
+        self.assertEqual(nonce_manager.peek(wallet.get_address(), 1), 3)
+
+    async def test_sign_transactions_invalid_values(self):
+        nonce_manager = NonceManager()
+        wallet = AsyncWallet(nonce_manager=nonce_manager)
+        await wallet.generate_from_private_key(PRIVATE_KEY)
+        nonce_manager.seed(wallet.get_address(), 1, 2)
+        payload = {key: value for key, value in PAYLOAD.items() if key != "nonce"}
+        signatures = await wallet.sign_transactions([payload, dict(payload, gas=-5)])
+        self.assertEqual(signatures[0]["hash"], EXPECTED_HASH)
+        self.assertIsInstance(signatures[1], SimbaTransactionException)
+        self.assertEqual(nonce_manager.peek(wallet.get_address(), 1), 3)
+        with pytest.raises(SimbaTransactionException):
+            await wallet.sign_transaction(dict(payload, gas=-5))
+        self.assertEqual(nonce_manager.peek(wallet.get_address(), 1), 3)
+
+    async def test_sign_transactions_allocation_failures(self):
+        nonce_manager = NonceManager()
+        wallet = AsyncWallet(nonce_manager=nonce_manager)
+        await wallet.generate_from_private_key(PRIVATE_KEY)
+        nonce_manager.seed(wallet.get_address(), 1, 2)
+        payload = {key: value for key, value in PAYLOAD.items() if key != "nonce"}
+        signatures = await wallet.sign_transactions([payload, dict(payload, chainId="zz"), 42, payload])
+        self.assertEqual(signatures[0]["nonce"], 2)
+        self.assertIsInstance(signatures[1], SimbaTransactionException)
+        self.assertIsInstance(signatures[2], SimbaTransactionException)
+        self.assertEqual(signatures[3]["nonce"], 3)
+        self.assertEqual(nonce_manager.peek(wallet.get_address(), 1), 4)
+
+    async def test_metrics(self):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            for wallet in (AsyncWallet(), AsyncWallet(executor=executor)):
+                metrics = RecordingMetricsSink()
+                wallet.metrics = metrics
+                await wallet.generate_from_private_key(PRIVATE_KEY)
+                signature = await wallet.sign_transaction(PAYLOAD)
+                self.assertEqual(signature["hash"], EXPECTED_HASH)
+                for stage in ("parse", "key", "sign", "serialize"):
+                    self.assertEqual(len(metrics.timings[f"sign_transaction.{stage}"]), 1)
+                with pytest.raises(SimbaTransactionException):
+                    await wallet.sign_transaction({"to": PAYLOAD["to"]})
+                await wallet.sign_transactions([PAYLOAD, {}])
+                self.assertEqual(metrics.count("sign_transaction.signed"), 2)
+                self.assertEqual(
+                    metrics.count("sign_transaction.failed", exception="SimbaTransactionException"),
+                    2,
+                )
+
+    async def test_sign_messages(self):
+        sync_wallet = Wallet()
+        sync_wallet.generate_from_private_key(PRIVATE_KEY)
+        typed_data = {
+            "types": {"Permit": [{"name": "value", "type": "uint256"}]},
+            "primaryType": "Permit",
+            "domain": {"name": "Token", "chainId": 1},
+            "message": {"value": 7},
+        }
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            for wallet in (AsyncWallet(max_concurrency=2), AsyncWallet(executor=executor)):
+                with pytest.raises(SimbaWalletNotFoundException):
+                    await wallet.sign("hello")
+                await wallet.generate_from_private_key(PRIVATE_KEY)
+                self.assertEqual(await wallet.sign("hello"), sync_wallet.sign("hello"))
+                self.assertEqual(await wallet.sign(typed_data), sync_wallet.sign(typed_data))
+                with pytest.raises(SimbaMessageException):
+                    await wallet.sign(42)
+                signatures = await wallet.sign_messages(
+                    [typed_data, 42, b"hello", dict(typed_data, primaryType=["Permit"])]
+                )
+                self.assertEqual(signatures[0], sync_wallet.sign(typed_data))
+                self.assertIsInstance(signatures[1], SimbaMessageException)
+                self.assertEqual(signatures[2], sync_wallet.sign(b"hello"))
+                self.assertIsInstance(signatures[3], SimbaMessageException)
+
+    async def test_process_executor(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            wallet = AsyncWallet(executor=executor)
+            await wallet.generate_from_private_key(PRIVATE_KEY)
+            signatures = await asyncio.gather(
+                *(wallet.sign_transaction(PAYLOAD) for _ in range(4))
+            )
+        self.assertEqual({signature["hash"] for signature in signatures}, {EXPECTED_HASH})
@@ -0,0 +1,141 @@
+import unittest
+
+import pytest
+
+from libsimba_utils.codec import (
+    RecordCodec,
+    _numpy,
+    decode_bytes32_batch,
+    encode_bytes32_batch,
+    encode_bytes32_buffer,
+)
+from libsimba_utils.utils import convert_bytes32_to_string, convert_to_bytes32_array
+
+
+STRINGS = [
+    "2020 Lorem ipsum dolor sit amet",
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut lab",
+    "https://picsum.photos/200/300/?t=asdfj938j0qf98jas0df8je098j2faa",
+    "",
+    "café ☃",
+]
+
+BACKENDS = [False, True] if _numpy() is not None else [False]
+
+
+class TestCodec(unittest.TestCase):
+    def test_encode_batch(self):
+        for use_numpy in BACKENDS:
+            for prefix in (True, False):
+                encoded = encode_bytes32_batch(STRINGS, 4, prefix=prefix, use_numpy=use_numpy)
+                expected = [convert_to_bytes32_array(string, 4, prefix=prefix) for string in STRINGS]
+                assert encoded == expected
+
+    def test_encode_batch_truncates(self):
+        for use_numpy in BACKENDS:
+            encoded = encode_bytes32_batch(STRINGS, 1, use_numpy=use_numpy)
+            assert encoded == [convert_to_bytes32_array(string, 1) for string in STRINGS]
+
+    def test_decode_batch(self):
+        encoded = [convert_to_bytes32_array(string, 4) for string in STRINGS]
+        for use_numpy in BACKENDS:
+            assert decode_bytes32_batch(encoded, use_numpy=use_numpy) == STRINGS
+            assert decode_bytes32_batch(encoded, 2, use_numpy=use_numpy) == [
+                convert_bytes32_to_string(record, 2) for record in encoded
+            ]
+
+    def test_buffer_round_trip(self):
+        for use_numpy in BACKENDS:
+            buffer = encode_bytes32_buffer(STRINGS, 4, use_numpy=use_numpy)
+            assert len(buffer) == len(STRINGS) * 4 * 32
+            assert bytes(buffer[128:256]) == bytes.fromhex(
+                "".join(chunk[2:] for chunk in convert_to_bytes32_array(STRINGS[1], 4))
+            )
+            assert decode_bytes32_batch(buffer, 4, use_numpy=use_numpy) == STRINGS
+
+    def test_empty(self):
+        for use_numpy in BACKENDS:
+            assert encode_bytes32_batch([], 2, use_numpy=use_numpy) == []
+            assert decode_bytes32_batch([], use_numpy=use_numpy) == []
+
+    def test_decode_invalid(self):
+        with pytest.raises(ValueError):
+            decode_bytes32_batch(bytes(33), 1)
+        with pytest.raises(ValueError):
+            decode_bytes32_batch(bytes(32))
+        with pytest.raises(ValueError):
+            decode_bytes32_batch([convert_to_bytes32_array("a", 1)], 2)
+
+
+RECORD = {
+    "name": "2020 Lorem ipsum dolor sit amet",
+    "contentHash": "0x8eebc511ae55f498d9f0a3a1ddcb58a0bb639c9f8f89d6c83e430f25de900ff2",
+    "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut lab",
+    "image": "https://picsum.photos/200/300/?t=asdfj938j0qf98jas0df8je098j2faa",
+}
+LAYOUT = {"name": 1, "description": 4, "image": 4, "contentHash": None}
+
+
+class TestRecordCodec(unittest.TestCase):
+    def test_encode(self):
+        codec = RecordCodec(LAYOUT)
+        self.assertEqual(codec.slots, 9)
+        for prefix in (True, False):
+            encoded = codec.encode(RECORD, prefix=prefix)
+            self.assertEqual(list(encoded), list(LAYOUT))
+            self.assertEqual(
+                encoded,
+                {
+                    "name": convert_to_bytes32_array(RECORD["name"], 1, prefix=prefix),
+                    "description": convert_to_bytes32_array(RECORD["description"], 4, prefix=prefix),
+                    "image": convert_to_bytes32_array(RECORD["image"], 4, prefix=prefix),
+                    "contentHash": RECORD["contentHash"],
+                },
+            )
+            self.assertEqual(codec.decode(encoded), RECORD)
+
+    def test_decode(self):
+        codec = RecordCodec(LAYOUT)
+        encoded = codec.encode(RECORD)
+        # single slot fields may be given as a single bytes32, longer arrays are cut
+        encoded["name"] = encoded["name"][0]
+        encoded["image"] = encoded["image"] + ["0x" + "00" * 32]
+        self.assertEqual(codec.decode(encoded), RECORD)
+        encoded["description"] = encoded["description"][:2]
+        with pytest.raises(ValueError) as exc:
+            codec.decode(encoded)
+        self.assertIn("Field description needs 4 slots, got 2", str(exc))
+
+    def test_oversized(self):
+        record = dict(RECORD, name="x" * 33)
+        with pytest.raises(ValueError) as exc:
+            RecordCodec(LAYOUT).encode(record)
+        self.assertIn("Field name is 33 bytes, more than its 1 slots hold (32 bytes)", str(exc))
+        encoded = RecordCodec(LAYOUT, truncate=True).encode(record)
+        self.assertEqual(encoded["name"], convert_to_bytes32_array(record["name"], 1))
+
+    def test_stream(self):
+        codec = RecordCodec(LAYOUT)
+        records = [dict(RECORD, name=f"Edition {index}") for index in range(5)]
+        encoded = codec.encode_many(iter(records))
+        self.assertEqual(next(encoded), codec.encode(records[0]))
+        self.assertEqual(list(codec.decode_many(encoded)), records[1:])
+
+    def test_invalid(self):
+        for layout in ({"name": 0}, {"name": "1"}, {"name": True}):
+            with pytest.raises(ValueError):
+                RecordCodec(layout)
+        codec = RecordCodec(LAYOUT)
+        for record in (
+            {key: value for key, value in RECORD.items() if key != "image"},
+            {key: value for key, value in RECORD.items() if key != "contentHash"},
+        ):
+            with pytest.raises(ValueError) as exc:
+                codec.encode(record)
+            self.assertIn("Missing field", str(exc))
+        with pytest.raises(ValueError) as exc:
+            codec.decode({"name": []})
+        self.assertIn("needs 1 slots", str(exc))
+        with pytest.raises(ValueError) as exc:
+            codec.decode({})
+        self.assertIn("Missing field: name", str(exc))
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from libsimba_utils.decoder import decode_transaction, iter_decode, verify_senders
+from libsimba_utils.exceptions import SimbaTransactionException
+from libsimba_utils.wallet import Wallet
+
+
+ADDRESS = "0xa8E070649A1D98651D281FdD428BD3EeC0d279e0"
+LEGACY_PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+}
+EIP1559_PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "maxPriorityFeePerGas": "0x3b9aca00",
+    "maxFeePerGas": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+}
+# well formed RLP with a list where data, or an access list storage key, should be
+NESTED_DATA = "0xca8080808080c1781b0101"
+NESTED_STORAGE_KEY = "0x02e50180808080808080d9d8941111111111111111111111111111111111111111c2c178010101"
+
+
+class TestDecoder(unittest.TestCase):
+    def setUp(self):
+        self.wallet = Wallet()
+        self.wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+
+    def test_decode_legacy(self):
+        signed = self.wallet.sign_transaction(dict(LEGACY_PAYLOAD, nonce=2))
+        decoded = decode_transaction(signed["rawTransaction"])
+        self.assertEqual(decoded["type"], 0)
+        self.assertEqual(decoded["nonce"], 2)
+        self.assertEqual(decoded["chainId"], 1)
+        self.assertEqual(decoded["gasPrice"], 0x3B9ACA00)
+        self.assertEqual(decoded["gas"], 0x5D6A)
+        self.assertEqual(decoded["to"], "0xdEA35E452B7367c43330e0065eC22538F545333b")
+        self.assertEqual(decoded["data"], LEGACY_PAYLOAD["data"])
+        self.assertEqual(decoded["hash"], signed["hash"])
+        self.assertEqual((decoded["r"], decoded["s"], decoded["v"]), (signed["r"], signed["s"], signed["v"]))
+        self.assertEqual(decoded["from"], ADDRESS)
+
+    def test_decode_legacy_no_chain_id(self):
+        payload = {key: value for key, value in LEGACY_PAYLOAD.items() if key != "chainId"}
+        signed = self.wallet.sign_transaction(dict(payload, nonce=0), output="raw")
+        decoded = decode_transaction(signed.raw_transaction)
+        self.assertIsNone(decoded["chainId"])
+        self.assertEqual(decoded["from"], ADDRESS)
+
+    def test_decode_1559(self):
+        signed = self.wallet.sign_transaction(dict(EIP1559_PAYLOAD, nonce=7))
+        decoded = decode_transaction(signed["rawTransaction"])
+        self.assertEqual(decoded["type"], 2)
+        self.assertEqual(decoded["nonce"], 7)
+        self.assertEqual(decoded["maxFeePerGas"], 0x3B9ACA00)
+        self.assertEqual(decoded["accessList"], [])
+        self.assertEqual(decoded["from"], ADDRESS)
+        self.assertNotIn("from", decode_transaction(signed["rawTransaction"], recover=False))
+
+    def test_decode_invalid(self):
+        for raw in ("0x", "0xzz", "0x05c0", "0xc3010203", NESTED_DATA, NESTED_STORAGE_KEY):
+            with pytest.raises(SimbaTransactionException) as exc:
+                decode_transaction(raw)
+            self.assertIn("Invalid raw transaction", str(exc))
+
+    def test_iter_decode_file(self):
+        raws = [
+            self.wallet.sign_transaction(dict(EIP1559_PAYLOAD, nonce=nonce))["rawTransaction"]
+            for nonce in range(5)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "transactions.txt")
+            with open(path, "w") as out:
+                out.write("\n".join(raws[:2] + ["", "0xzz"] + raws[2:3] + [NESTED_DATA] + raws[3:]) + "\n")
+            for workers in (None, 2):
+                decoded = list(iter_decode(path, workers=workers, chunksize=2))
+                self.assertEqual(len(decoded), 7)
+                self.assertIsInstance(decoded[2], SimbaTransactionException)
+                self.assertIsInstance(decoded[4], SimbaTransactionException)
+                self.assertEqual(
+                    [transaction["nonce"] for transaction in decoded if isinstance(transaction, dict)],
+                    list(range(5)),
+                )
+
+    def test_verify_senders(self):
+        other = Wallet()
+        other.generate_from_mnemonic()
+        raws = [
+            self.wallet.sign_transaction(dict(LEGACY_PAYLOAD, nonce=0))["rawTransaction"],
+            other.sign_transaction(dict(LEGACY_PAYLOAD, nonce=0))["rawTransaction"],
+            "0x00",
+            self.wallet.sign_transaction(dict(LEGACY_PAYLOAD, nonce=1))["rawTransaction"],
+        ]
+        mismatches = list(verify_senders(raws, self.wallet))
+        self.assertEqual([index for index, _ in mismatches], [1, 2])
+        self.assertEqual(mismatches[0][1]["from"], other.get_address())
+        self.assertIsInstance(mismatches[1][1], SimbaTransactionException)
+        self.assertEqual(list(verify_senders(raws[:1], ADDRESS.lower())), [])
@@ -0,0 +1,49 @@
+import unittest
+
+import pytest
+
+from hdwallet import BIP44HDWallet
+from hdwallet.cryptocurrencies import EthereumMainnet
+
+from libsimba_utils.derivation import AccountDeriver, derive_accounts
+from libsimba_utils.exceptions import SimbaMnemonicException
+
+
+MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+
+
+def hdwallet_account(index: int, account: int = 0, passphrase: str = None) -> BIP44HDWallet:
+    wallet = BIP44HDWallet(cryptocurrency=EthereumMainnet)
+    wallet.from_mnemonic(mnemonic=MNEMONIC, language="english", passphrase=passphrase)
+    wallet.clean_derivation()
+    wallet.from_path(f"m/44'/60'/{account}'/0/{index}")
+    return wallet
+
+
+class TestDerivation(unittest.TestCase):
+    def test_derive_accounts(self):
+        accounts = list(derive_accounts(MNEMONIC, start=3, count=3))
+        self.assertEqual([account.index for account in accounts], [3, 4, 5])
+        for account in accounts:
+            expected = hdwallet_account(account.index)
+            self.assertEqual(account.path, f"m/44'/60'/0'/0/{account.index}")
+            self.assertEqual(account.address, expected.address())
+            self.assertEqual(account.private_key, expected.private_key())
+
+    def test_known_address(self):
+        account = AccountDeriver(MNEMONIC).derive(0)
+        self.assertEqual(account.address, "0x9858EfFD232B4033E47d90003D41EC34EcaEda94")
+
+    def test_account_and_passphrase(self):
+        deriver = AccountDeriver(MNEMONIC, passphrase="secret", account=2)
+        expected = hdwallet_account(7, account=2, passphrase="secret")
+        self.assertEqual(deriver.derive(7).private_key, expected.private_key())
+
+    def test_wallet(self):
+        wallet = AccountDeriver(MNEMONIC).wallet(1)
+        self.assertEqual(wallet.get_address(), hdwallet_account(1).address())
+
+    def test_invalid_mnemonic(self):
+        with pytest.raises(SimbaMnemonicException) as exc:
+            AccountDeriver("invalid")
+        self.assertIn("Invalid mnemonic words", str(exc))
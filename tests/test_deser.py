@@ -67,3 +67,15 @@ class TestSer(unittest.TestCase):
         assert int_val2 == int_val
         int_val3 = string_to_uint256(f"A {' '.join(['very' for i in range(100)])}long string")
         assert int_val3 == 44831467989385379626249444820128067825371402133342580492608562458279217187427
+
+    def test_bytes_to_string_raw(self):
+        description = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut lab"
+        hex_array = convert_to_bytes32_array(description, 4)
+        raw_array = [bytes.fromhex(chunk[2:]) for chunk in hex_array]
+        raw = b"".join(raw_array)
+        assert convert_bytes32_to_string(raw_array) == description
+        assert convert_bytes32_to_string(raw) == description
+        assert convert_bytes32_to_string(bytearray(raw)) == description
+        assert convert_bytes32_to_string(memoryview(raw), 2) == description[:64]
+        assert convert_bytes32_to_string(tuple(raw_array), 2) == description[:64]
+        assert convert_bytes32_to_string([]) == ""
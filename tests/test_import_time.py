@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import libsimba_utils.wallet
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    def _import_wallet(self) -> dict:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT], cwd=root)
+        return json.loads(output)
+
+    def test_wallet_import_is_lazy(self):
+        modules = set(self._import_wallet()["modules"])
+        for heavy in ("web3", "hdwallet", "eth_account", "eth_keys", "multiprocessing"):
+            self.assertNotIn(heavy, modules)
+
+    def test_wallet_import_is_fast(self):
+        # importing web3 and hdwallet eagerly took the best part of a second
+        elapsed = min(self._import_wallet()["elapsed"] for _ in range(3))
+        self.assertLess(elapsed, 0.1)
@@ -0,0 +1,70 @@
+import unittest
+
+import pytest
+
+from libsimba_utils.exceptions import (
+    SimbaTransactionException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.instrumentation import MetricsSink, RecordingMetricsSink
+from libsimba_utils.wallet import Wallet
+
+
+PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+    "nonce": "0x2",
+}
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.wallet = Wallet()
+        self.wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+        self.metrics = RecordingMetricsSink()
+        self.wallet.metrics = self.metrics
+
+    def test_sign_transaction_metrics(self):
+        uninstrumented = Wallet()
+        uninstrumented.generate_from_private_key(self.wallet.wallet.private_key())
+        self.assertEqual(
+            self.wallet.sign_transaction(PAYLOAD), uninstrumented.sign_transaction(PAYLOAD)
+        )
+        for stage in ("parse", "key", "sign", "serialize"):
+            timings = self.metrics.timings[f"sign_transaction.{stage}"]
+            self.assertEqual(len(timings), 1)
+            self.assertGreaterEqual(timings[0], 0)
+        self.assertEqual(self.metrics.count("sign_transaction.signed"), 1)
+
+    def test_sign_transaction_failures(self):
+        with pytest.raises(SimbaTransactionException):
+            self.wallet.sign_transaction({"to": PAYLOAD["to"]})
+        self.assertEqual(
+            self.metrics.count("sign_transaction.failed", exception="SimbaTransactionException"), 1
+        )
+        self.wallet.delete_wallet()
+        with pytest.raises(SimbaWalletNotFoundException):
+            self.wallet.sign_transaction(PAYLOAD)
+        self.assertEqual(
+            self.metrics.count("sign_transaction.failed", exception="SimbaWalletNotFoundException"), 1
+        )
+        self.assertEqual(self.metrics.count("sign_transaction.signed"), 0)
+
+    def test_sign_transactions_metrics(self):
+        self.wallet.sign_transactions([PAYLOAD, {}, PAYLOAD])
+        self.assertEqual(self.metrics.count("sign_transaction.signed"), 2)
+        self.assertEqual(
+            self.metrics.count("sign_transaction.failed", exception="SimbaTransactionException"), 1
+        )
+
+    def test_base_sink(self):
+        with pytest.raises(NotImplementedError):
+            MetricsSink().timing("name", 1.0)
+        with pytest.raises(NotImplementedError):
+            MetricsSink().increment("name")
@@ -0,0 +1,169 @@
+import io
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from libsimba_utils import keccak
+from libsimba_utils.keccak import KeccakCache
+from libsimba_utils.utils import (
+    keccak_hash,
+    keccak_hash_directory,
+    keccak_hash_file,
+    keccak_hash_files,
+    keccak_hash_many,
+    keccak_hash_stream,
+    string_to_uint256,
+    strings_to_uint256,
+)
+
+
+VALUES = ["A short string", "", "café ☃", "x" * 1000]
+
+
+class TestKeccak(unittest.TestCase):
+    def tearDown(self):
+        keccak.set_backend()
+
+    def test_default_backend(self):
+        self.assertEqual(keccak.get_backend(), keccak.available_backends()[0])
+
+    def test_backends_identical(self):
+        backends = keccak.available_backends()
+        self.assertIn("pycryptodome", backends)
+        digests = {}
+        for backend in backends:
+            keccak.set_backend(backend)
+            digests[backend] = [
+                keccak_hash(value, bits=bits) for value in VALUES for bits in (224, 256, 384, 512)
+            ]
+        for backend in backends:
+            self.assertEqual(digests[backend], digests["pycryptodome"])
+        keccak.set_backend(backends[0])
+        self.assertEqual(
+            keccak_hash("A short string"),
+            "c02616352442fd8d6b29e47623743b0644e7168b988c4545b71df141245db363",
+        )
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            keccak.set_backend("unknown")
+
+    def test_bytes_input(self):
+        expected = keccak_hash("café ☃")
+        encoded = "café ☃".encode("utf-8")
+        for value in (encoded, bytearray(encoded), memoryview(encoded)):
+            self.assertEqual(keccak_hash(value), expected)
+        self.assertEqual(string_to_uint256(encoded), string_to_uint256("café ☃"))
+
+    def test_incremental(self):
+        hasher = keccak.new(256)
+        for value in VALUES:
+            hasher.update(value.encode("utf-8"))
+        self.assertEqual(hasher.hexdigest(), keccak_hash("".join(VALUES)))
+
+    def test_hasher(self):
+        for backend in keccak.available_backends():
+            keccak.set_backend(backend)
+            for bits in (224, 256, 384, 512):
+                self.assertEqual(
+                    keccak.hasher(bits)(b"abc").digest(),
+                    keccak.new(bits, b"abc").digest(),
+                )
+            with pytest.raises(ValueError):
+                keccak.hasher(128)
+
+    def test_batch(self):
+        self.assertEqual(keccak_hash_many(VALUES), [keccak_hash(value) for value in VALUES])
+        self.assertEqual(
+            keccak_hash_many(VALUES, bits=512, as_hex=False),
+            [keccak_hash(value, bits=512, as_hex=False) for value in VALUES],
+        )
+        for big_endian in (True, False):
+            self.assertEqual(
+                strings_to_uint256(VALUES, big_endian=big_endian),
+                [string_to_uint256(value, big_endian=big_endian) for value in VALUES],
+            )
+
+    def test_cache(self):
+        cache = KeccakCache(maxsize=2)
+        self.assertEqual(cache.hash("A short string"), keccak_hash("A short string"))
+        self.assertEqual(cache.hash("A short string", as_hex=False), keccak_hash("A short string", as_hex=False))
+        self.assertEqual(cache.hash(memoryview(b"abc")), keccak_hash(b"abc"))
+        self.assertEqual(cache.uint256("A short string"), string_to_uint256("A short string"))
+        self.assertEqual(cache.hash_many(VALUES), keccak_hash_many(VALUES))
+        info = cache.cache_info()
+        self.assertEqual(info.maxsize, 2)
+        self.assertEqual(info.currsize, 2)
+        self.assertEqual(info.hits, 3)
+        cache.clear()
+        self.assertEqual(cache.cache_info().currsize, 0)
+
+
+class TestFileHash(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.contents = {
+            "empty": b"",
+            "small.txt": "café ☃".encode("utf-8"),
+            "nested/large.bin": os.urandom(3 * 1024 * 1024 + 17),
+        }
+        for name, content in self.contents.items():
+            path = os.path.join(self.directory.name, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as out:
+                out.write(content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        keccak.set_backend()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, *name.split("/"))
+
+    def test_stream(self):
+        for content in self.contents.values():
+            self.assertEqual(
+                keccak_hash_stream(io.BytesIO(content), chunk_size=1000),
+                keccak_hash(content),
+            )
+        self.assertEqual(
+            keccak_hash_stream(io.BytesIO(b"abc"), bits=512, as_hex=False),
+            keccak_hash(b"abc", bits=512, as_hex=False),
+        )
+
+    def test_file(self):
+        for backend in keccak.available_backends():
+            keccak.set_backend(backend)
+            for name, content in self.contents.items():
+                expected = keccak_hash(content, as_hex=False)
+                for use_mmap in (True, False):
+                    self.assertEqual(
+                        keccak_hash_file(
+                            self.path(name), as_hex=False, use_mmap=use_mmap, chunk_size=4096
+                        ),
+                        expected,
+                    )
+        self.assertEqual(keccak_hash_file(self.path("small.txt")), keccak_hash("café ☃"))
+        with pytest.raises(FileNotFoundError):
+            keccak_hash_file(self.path("missing"))
+
+    def test_files(self):
+        names = list(self.contents) * 2
+        expected = [keccak_hash(self.contents[name]) for name in names]
+        for workers in (None, 1, 3):
+            self.assertEqual(
+                keccak_hash_files([self.path(name) for name in names], workers=workers),
+                expected,
+            )
+        self.assertEqual(keccak_hash_files([]), [])
+
+    def test_directory(self):
+        self.assertEqual(
+            keccak_hash_directory(self.directory.name, as_hex=False),
+            {
+                name: keccak_hash(self.contents[name], as_hex=False)
+                for name in sorted(self.contents)
+            },
+        )
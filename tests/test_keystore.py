@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from libsimba_utils.async_wallet import AsyncWallet
+from libsimba_utils.exceptions import SimbaKeystoreException
+from libsimba_utils.keystore import (
+    UnlockCache,
+    decrypt_keystore,
+    encrypt_keystore,
+    unlock_keystore,
+    unlock_keystores,
+)
+from libsimba_utils.wallet import Wallet
+
+
+PRIVATE_KEY = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+ADDRESS = "0xa8E070649A1D98651D281FdD428BD3EeC0d279e0"
+
+
+class TestKeystore(unittest.TestCase):
+    def setUp(self):
+        # low work factors keep the tests fast
+        self.keystore = encrypt_keystore(PRIVATE_KEY, "passkey", kdf="scrypt", iterations=1024)
+
+    def test_encrypt_decrypt(self):
+        self.assertEqual(self.keystore["crypto"]["kdfparams"]["n"], 1024)
+        self.assertEqual(decrypt_keystore(self.keystore, "passkey").hex(), PRIVATE_KEY)
+        pbkdf2 = encrypt_keystore(bytes.fromhex(PRIVATE_KEY), "passkey", kdf="pbkdf2", iterations=10)
+        self.assertEqual(pbkdf2["crypto"]["kdfparams"]["c"], 10)
+        self.assertEqual(decrypt_keystore(json.dumps(pbkdf2), "passkey").hex(), PRIVATE_KEY)
+
+    def test_wrong_passkey(self):
+        with pytest.raises(SimbaKeystoreException) as exc:
+            decrypt_keystore(self.keystore, "wrong")
+        self.assertIn("MAC mismatch", str(exc))
+
+    def test_invalid_keystore(self):
+        with pytest.raises(SimbaKeystoreException):
+            decrypt_keystore("/does/not/exist.json", "passkey")
+        with pytest.raises(SimbaKeystoreException):
+            encrypt_keystore(PRIVATE_KEY, "passkey", kdf="unknown")
+
+    def test_unlock_cache(self):
+        cache = UnlockCache(ttl=60)
+        self.assertEqual(unlock_keystore(self.keystore, "passkey", cache).hex(), PRIVATE_KEY)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get(self.keystore, "wrong"))
+        # a cached unlock does not run the KDF
+        tampered = dict(self.keystore, crypto=dict(self.keystore["crypto"], kdf="unknown"))
+        cache.put(tampered, "passkey", bytes.fromhex(PRIVATE_KEY))
+        self.assertEqual(unlock_keystore(tampered, "passkey", cache).hex(), PRIVATE_KEY)
+        with pytest.raises(SimbaKeystoreException):
+            unlock_keystore(tampered, "passkey", None)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_unlock_cache_opt_in(self):
+        self.assertIsNone(Wallet().unlock_cache)
+        cache = UnlockCache()
+        wallet = Wallet(keystore=self.keystore, unlock_cache=cache)
+        wallet.unlock_wallet("passkey")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(unlock_keystore(self.keystore, "passkey", cache).hex(), PRIVATE_KEY)
+
+    def test_unlock_cache_expiry(self):
+        cache = UnlockCache(ttl=0)
+        cache.put(self.keystore, "passkey", bytes.fromhex(PRIVATE_KEY))
+        self.assertIsNone(cache.get(self.keystore, "passkey"))
+        cache = UnlockCache(ttl=60, maxsize=1)
+        cache.put(self.keystore, "passkey", bytes.fromhex(PRIVATE_KEY))
+        cache.put(self.keystore, "other", bytes.fromhex(PRIVATE_KEY))
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get(self.keystore, "passkey"))
+
+    def test_wallet_unlock(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "keystore.json")
+            with open(path, "w") as keystore_file:
+                json.dump(self.keystore, keystore_file)
+            wallet = Wallet(keystore=path)
+            wallet.unlock_wallet("passkey")
+        self.assertEqual(wallet.get_address(), ADDRESS)
+        with pytest.raises(SimbaKeystoreException):
+            Wallet().unlock_wallet("passkey")
+        with pytest.raises(SimbaKeystoreException):
+            Wallet().unlock_wallet("wrong", self.keystore)
+
+    def test_wallet_export(self):
+        wallet = Wallet()
+        wallet.generate_from_private_key(PRIVATE_KEY)
+        keystore = wallet.export_keystore("passkey", kdf="pbkdf2", iterations=10)
+        unlocked = Wallet()
+        unlocked.unlock_wallet("passkey", keystore)
+        self.assertEqual(unlocked.get_address(), ADDRESS)
+
+    def test_unlock_keystores(self):
+        other = Wallet()
+        other.generate_from_mnemonic()
+        keystores = [
+            self.keystore,
+            other.export_keystore("passkey", iterations=1024),
+            self.keystore,
+            "{invalid",
+        ]
+        for workers in (None, 2):
+            cache = UnlockCache()
+            results = unlock_keystores(keystores, ["passkey", "passkey", "wrong", "passkey"], workers, cache)
+            self.assertEqual(results[0].hex(), PRIVATE_KEY)
+            self.assertEqual(results[1].hex(), other.wallet.private_key())
+            self.assertIsInstance(results[2], SimbaKeystoreException)
+            self.assertIsInstance(results[3], SimbaKeystoreException)
+            self.assertEqual(len(cache), 2)
+
+        wallets = Wallet.unlock_wallets(keystores[:2], "passkey", workers=2)
+        self.assertEqual([wallet.get_address() for wallet in wallets], [ADDRESS, other.get_address()])
+
+
+class TestAsyncKeystore(unittest.IsolatedAsyncioTestCase):
+    async def test_unlock_wallet(self):
+        keystore = encrypt_keystore(PRIVATE_KEY, "passkey", iterations=1024)
+        wallet = AsyncWallet(keystore=keystore)
+        await wallet.unlock_wallet("passkey")
+        self.assertEqual(wallet.get_address(), ADDRESS)
+        with pytest.raises(SimbaKeystoreException):
+            await AsyncWallet().unlock_wallet("passkey")
+        cache = UnlockCache()
+        wallet = AsyncWallet(keystore=keystore, unlock_cache=cache)
+        await wallet.unlock_wallet("passkey")
+        self.assertEqual(len(cache), 1)
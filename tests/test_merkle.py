@@ -0,0 +1,88 @@
+import unittest
+
+import pytest
+
+from libsimba_utils.exceptions import SimbaMerkleException
+from libsimba_utils.merkle import MerkleTree, hash_pair, process_proof, verify_proof
+from libsimba_utils.utils import keccak_hash
+
+
+def reference_root(leaves):
+    # sorted pairs, odd nodes promoted
+    level = list(leaves)
+    while len(level) > 1:
+        level = [
+            hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+    return level[0]
+
+
+LEAVES = [keccak_hash(f"document {index}", as_hex=False) for index in range(37)]
+
+
+class TestMerkle(unittest.TestCase):
+    def test_hash_pair(self):
+        a, b = LEAVES[0], LEAVES[1]
+        self.assertEqual(hash_pair(a, b), hash_pair(b, a))
+        self.assertEqual(
+            hash_pair(a, b), keccak_hash(min(a, b) + max(a, b), as_hex=False)
+        )
+        self.assertEqual(
+            hash_pair(a.hex(), "0x" + b.hex(), as_hex=True), hash_pair(a, b).hex()
+        )
+
+    def test_root(self):
+        for count in (1, 2, 3, 4, 5, 8, 13, 37):
+            tree = MerkleTree(LEAVES[:count])
+            self.assertEqual(len(tree), count)
+            self.assertEqual(tree.root(as_hex=False), reference_root(LEAVES[:count]))
+            self.assertEqual(tree.root(), reference_root(LEAVES[:count]).hex())
+        self.assertEqual(MerkleTree(LEAVES[:1]).root(as_hex=False), LEAVES[0])
+
+    def test_incremental(self):
+        tree = MerkleTree()
+        for index, leaf in enumerate(LEAVES):
+            self.assertEqual(tree.append(leaf.hex()), index)
+            self.assertEqual(
+                tree.root(as_hex=False), reference_root(LEAVES[: index + 1])
+            )
+        tree = MerkleTree(LEAVES[:5])
+        tree.extend(LEAVES[5:20])
+        tree.extend([])
+        tree.extend(LEAVES[20:])
+        self.assertEqual(tree.root(), MerkleTree(LEAVES).root())
+
+    def test_proofs(self):
+        for count in (1, 2, 7, 37):
+            tree = MerkleTree(LEAVES[:count])
+            root = tree.root()
+            for index in range(count):
+                proof = tree.proof(index)
+                self.assertLessEqual(len(proof), count.bit_length())
+                self.assertTrue(verify_proof(proof, root, tree.leaf(index)))
+                self.assertEqual(
+                    process_proof(tree.proof(index, as_hex=False), LEAVES[index]),
+                    tree.root(as_hex=False),
+                )
+        self.assertFalse(verify_proof(tree.proof(0), tree.root(), LEAVES[1]))
+        self.assertEqual(MerkleTree(LEAVES[:1]).proof(0), [])
+
+    def test_invalid(self):
+        with pytest.raises(SimbaMerkleException) as exc:
+            MerkleTree().root()
+        self.assertIn("The tree has no leaves", str(exc))
+        tree = MerkleTree(LEAVES[:3])
+        for index in (-1, 3):
+            with pytest.raises(SimbaMerkleException):
+                tree.proof(index)
+        with pytest.raises(SimbaMerkleException) as exc:
+            tree.append(b"short")
+        self.assertIn("Hashes must be 32 bytes, got 5", str(exc))
+        with pytest.raises(SimbaMerkleException) as exc:
+            tree.append("0xzz")
+        self.assertIn("Invalid hash", str(exc))
+        with pytest.raises(SimbaMerkleException):
+            tree.extend([LEAVES[3], b"short"])
+        self.assertEqual(len(tree), 3)
+        self.assertEqual(tree.root(), MerkleTree(LEAVES[:3]).root())
@@ -0,0 +1,247 @@
+import unittest
+
+import pytest
+
+from libsimba_utils.exceptions import (
+    SimbaMessageException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.messages import (
+    _domain_separator,
+    compile_schema,
+    domain_separator,
+    typed_data_hash,
+)
+from libsimba_utils.wallet import Wallet
+
+
+MAIL = {
+    "types": {
+        "EIP712Domain": [
+            {"name": "name", "type": "string"},
+            {"name": "version", "type": "string"},
+            {"name": "chainId", "type": "uint256"},
+            {"name": "verifyingContract", "type": "address"},
+        ],
+        "Person": [
+            {"name": "name", "type": "string"},
+            {"name": "wallet", "type": "address"},
+        ],
+        "Mail": [
+            {"name": "from", "type": "Person"},
+            {"name": "to", "type": "Person"},
+            {"name": "contents", "type": "string"},
+        ],
+    },
+    "primaryType": "Mail",
+    "domain": {
+        "name": "Ether Mail",
+        "version": "1",
+        "chainId": 1,
+        "verifyingContract": "0xCcCCccccCCCCcCCCCCCcCcCccCcCCCcCcccccccC",
+    },
+    "message": {
+        "from": {"name": "Cow", "wallet": "0xCD2a3d9F938E13CD947Ec05AbC7FE734Df8DD826"},
+        "to": {"name": "Bob", "wallet": "0xbBbBBBBbbBBBbbbBbbBbbbbBBbBbbbbBbBbbBBbB"},
+        "contents": "Hello, Bob!",
+    },
+}
+ORDER = {
+    "types": {
+        "EIP712Domain": [
+            {"name": "name", "type": "string"},
+            {"name": "chainId", "type": "uint256"},
+        ],
+        "Order": [
+            {"name": "maker", "type": "address"},
+            {"name": "amounts", "type": "uint256[]"},
+            {"name": "delta", "type": "int64"},
+            {"name": "salt", "type": "bytes32"},
+            {"name": "payload", "type": "bytes"},
+            {"name": "active", "type": "bool"},
+            {"name": "tags", "type": "string[2]"},
+        ],
+    },
+    "primaryType": "Order",
+    "domain": {"name": "Exchange", "chainId": 1337},
+    "message": {
+        "maker": "0xa8E070649A1D98651D281FdD428BD3EeC0d279e0",
+        "amounts": [1, "0x10", 2**255],
+        "delta": -42,
+        "salt": b"\xab" * 32,
+        "payload": b"\xde\xad\xbe\xef",
+        "active": True,
+        "tags": ["a", "b"],
+    },
+}
+
+
+class TestMessages(unittest.TestCase):
+    def setUp(self):
+        self.wallet = Wallet()
+        self.wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+
+    def test_eip712_spec_example(self):
+        self.assertEqual(
+            compile_schema(MAIL["types"]).encode_type("Mail"),
+            "Mail(Person from,Person to,string contents)Person(string name,address wallet)",
+        )
+        self.assertEqual(
+            domain_separator(MAIL["domain"]).hex(),
+            "f2cee375fa42b42143804025fc449deafd50cc031ca257e0b194a650a912090f",
+        )
+        self.assertEqual(
+            typed_data_hash(MAIL).hex(),
+            "be609aee343fb3c4b28e1df9e632fca64fcfaede20f02e86244efddf30957bd2",
+        )
+
+    def test_sign_typed_data(self):
+        from eth_account import Account
+        from eth_account.messages import encode_structured_data
+
+        # eth_account 0.5 cannot encode bytes or arrays of atomic types, see test_encode_data
+        scalar_fields = [
+            field
+            for field in ORDER["types"]["Order"]
+            if field["type"] in ("address", "int64", "bool")
+        ]
+        scalar_order = dict(
+            ORDER,
+            types=dict(ORDER["types"], Order=scalar_fields),
+            message={
+                field["name"]: ORDER["message"][field["name"]]
+                for field in scalar_fields
+            },
+        )
+        for typed_data in (MAIL, scalar_order):
+            expected = Account.sign_message(
+                encode_structured_data(typed_data), self.wallet.wallet.private_key()
+            )
+            signature = self.wallet.sign(typed_data)
+            self.assertEqual(signature["messageHash"], expected.messageHash.hex())
+            self.assertEqual(signature["signature"], expected.signature.hex())
+            self.assertEqual(
+                (signature["r"], signature["s"], signature["v"]),
+                (expected.r, expected.s, expected.v),
+            )
+
+    def test_sign_message(self):
+        from eth_account import Account
+        from eth_account.messages import encode_defunct
+
+        for message in ("hello", "", b"\x00\x01\xff"):
+            encoded = (
+                encode_defunct(text=message)
+                if isinstance(message, str)
+                else encode_defunct(primitive=message)
+            )
+            expected = Account.sign_message(encoded, self.wallet.wallet.private_key())
+            signature = self.wallet.sign(message)
+            self.assertEqual(signature["messageHash"], expected.messageHash.hex())
+            self.assertEqual(signature["signature"], expected.signature.hex())
+            self.assertEqual(
+                Account.recover_message(encoded, signature=signature["signature"]),
+                self.wallet.get_address(),
+            )
+
+    def test_encode_data(self):
+        from libsimba_utils.utils import keccak_hash
+
+        schema = compile_schema(ORDER["types"])
+        message = ORDER["message"]
+        encoded = schema.type_hashes["Order"] + b"".join(
+            (
+                bytes(12) + bytes.fromhex(message["maker"][2:]),
+                bytes.fromhex(
+                    keccak_hash(
+                        (1).to_bytes(32, "big")
+                        + (16).to_bytes(32, "big")
+                        + (2**255).to_bytes(32, "big")
+                    )
+                ),
+                (2**256 - 42).to_bytes(32, "big"),
+                b"\xab" * 32,
+                bytes.fromhex(keccak_hash(bytes.fromhex("deadbeef"))),
+                (1).to_bytes(32, "big"),
+                bytes.fromhex(
+                    keccak_hash(
+                        bytes.fromhex(keccak_hash("a"))
+                        + bytes.fromhex(keccak_hash("b"))
+                    )
+                ),
+            )
+        )
+        self.assertEqual(
+            schema.hash_struct("Order", message), bytes.fromhex(keccak_hash(encoded))
+        )
+
+    def test_schema_memoized(self):
+        self.assertIs(
+            compile_schema(ORDER["types"]), compile_schema(dict(ORDER["types"]))
+        )
+        before = _domain_separator.cache_info().hits
+        for nonce in range(3):
+            self.wallet.sign(
+                dict(MAIL, message=dict(MAIL["message"], contents=str(nonce)))
+            )
+        self.assertEqual(_domain_separator.cache_info().hits, before + 3)
+
+    def test_invalid(self):
+        for typed_data, message in (
+            (
+                {key: value for key, value in MAIL.items() if key != "domain"},
+                "Missing field in typed data: 'domain'",
+            ),
+            (dict(MAIL, primaryType="Letter"), "Unknown type: Letter"),
+            (dict(MAIL, primaryType=["Mail"]), "Invalid primaryType"),
+            (dict(MAIL, types=[MAIL["types"]]), "Invalid types"),
+            (dict(MAIL, domain=[MAIL["domain"]]), "Invalid domain"),
+            (
+                dict(MAIL, message={"from": MAIL["message"]["from"]}),
+                "Missing field in Mail: 'to'",
+            ),
+            (
+                dict(ORDER, message=dict(ORDER["message"], delta=2**63)),
+                "Value out of range for int64",
+            ),
+            (
+                dict(ORDER, message=dict(ORDER["message"], salt="0x" + "ab" * 33)),
+                "Value too long for bytes32",
+            ),
+            (
+                dict(ORDER, message=dict(ORDER["message"], tags=["a"])),
+                "Invalid value for string[2]",
+            ),
+            (
+                dict(ORDER, message=dict(ORDER["message"], maker="0x1234")),
+                "Invalid value for address",
+            ),
+            (
+                dict(ORDER, types={"Order": [{"name": "x", "type": "uint7"}]}),
+                "Unknown type: uint7",
+            ),
+        ):
+            with pytest.raises(SimbaMessageException) as exc:
+                self.wallet.sign(typed_data)
+            self.assertIn(message, str(exc))
+        with pytest.raises(SimbaMessageException):
+            self.wallet.sign(42)
+
+    def test_sign_messages(self):
+        payloads = [MAIL, "hello", 42, ORDER, dict(MAIL, primaryType=["Mail"]), dict(MAIL, types=[])]
+        for workers in (None, 2):
+            signatures = self.wallet.sign_messages(payloads, workers=workers)
+            self.assertEqual(signatures[0], self.wallet.sign(MAIL))
+            self.assertEqual(signatures[1], self.wallet.sign("hello"))
+            self.assertIsInstance(signatures[2], SimbaMessageException)
+            self.assertEqual(signatures[3], self.wallet.sign(ORDER))
+            self.assertIsInstance(signatures[4], SimbaMessageException)
+            self.assertIsInstance(signatures[5], SimbaMessageException)
+
+    def test_no_wallet(self):
+        with pytest.raises(SimbaWalletNotFoundException):
+            Wallet().sign("hello")
+        with pytest.raises(SimbaWalletNotFoundException):
+            Wallet().sign_messages(["hello"])
@@ -0,0 +1,149 @@
+import threading
+import unittest
+
+import pytest
+
+from libsimba_utils.exceptions import SimbaNonceException, SimbaTransactionException
+from libsimba_utils.nonce import NonceManager, normalize_chain_id
+from libsimba_utils.wallet import Wallet
+
+
+ADDRESS = "0xa8E070649A1D98651D281FdD428BD3EeC0d279e0"
+
+
+class TestNonceManager(unittest.TestCase):
+    def test_normalize_chain_id(self):
+        self.assertEqual(normalize_chain_id("0x1"), 1)
+        self.assertEqual(normalize_chain_id("137"), 137)
+        self.assertEqual(normalize_chain_id(5), 5)
+        self.assertIsNone(normalize_chain_id(None))
+        with pytest.raises(SimbaNonceException) as exc:
+            normalize_chain_id("zz")
+        self.assertIn("Invalid chain id: 'zz'", str(exc))
+
+    def test_allocate(self):
+        manager = NonceManager()
+        manager.seed(ADDRESS, "0x1", 7)
+        self.assertEqual(manager.allocate(ADDRESS, 1), 7)
+        self.assertEqual(manager.allocate(ADDRESS.lower(), "0x1"), 8)
+        self.assertEqual(manager.peek(ADDRESS, 1), 9)
+        # chains are independent
+        manager.seed(ADDRESS, 5, 0)
+        self.assertEqual(manager.allocate(ADDRESS, 5), 0)
+        self.assertEqual(manager.allocate(ADDRESS, 1), 9)
+
+    def test_allocate_not_seeded(self):
+        manager = NonceManager()
+        with pytest.raises(SimbaNonceException) as exc:
+            manager.allocate(ADDRESS, 1)
+        self.assertIn("No nonce seeded", str(exc))
+
+    def test_release_reuses_gaps(self):
+        manager = NonceManager()
+        manager.seed(ADDRESS, 1, 0)
+        nonces = [manager.allocate(ADDRESS, 1) for _ in range(5)]
+        self.assertEqual(nonces, [0, 1, 2, 3, 4])
+        manager.release(ADDRESS, 1, 3)
+        manager.release(ADDRESS, 1, 1)
+        self.assertEqual(manager.allocate(ADDRESS, 1), 1)
+        self.assertEqual(manager.allocate(ADDRESS, 1), 3)
+        self.assertEqual(manager.allocate(ADDRESS, 1), 5)
+        # releasing the tail shrinks the range
+        manager.release(ADDRESS, 1, 4)
+        manager.release(ADDRESS, 1, 5)
+        self.assertEqual(manager.peek(ADDRESS, 1), 4)
+        with pytest.raises(SimbaNonceException) as exc:
+            manager.release(ADDRESS, 1, 4)
+        self.assertIn("Nonce 4 is not allocated", str(exc))
+
+    def test_release_below_seed(self):
+        manager = NonceManager()
+        manager.seed(ADDRESS, 1, 5)
+        with pytest.raises(SimbaNonceException) as exc:
+            manager.release(ADDRESS, 1, 2)
+        self.assertIn("Nonce 2 is not allocated", str(exc))
+        self.assertEqual(manager.allocate(ADDRESS, 1), 5)
+        manager.release(ADDRESS, 1, 5)
+        with pytest.raises(SimbaNonceException):
+            manager.release(ADDRESS, 1, 4)
+        self.assertEqual(manager.allocate(ADDRESS, 1), 5)
+
+    def test_allocate_threads(self):
+        manager = NonceManager()
+        manager.seed(ADDRESS, 1, 100)
+        allocated = []
+
+        def allocate():
+            nonces = [manager.allocate(ADDRESS, 1) for _ in range(500)]
+            allocated.extend(nonces)
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(allocated), list(range(100, 4100)))
+
+    def test_reset(self):
+        manager = NonceManager()
+        manager.seed(ADDRESS, 1, 0)
+        manager.reset(ADDRESS, 1)
+        self.assertFalse(manager.is_seeded(ADDRESS, 1))
+
+    def test_wallet_allocates_nonces(self):
+        manager = NonceManager()
+        wallet = Wallet(nonce_manager=manager)
+        wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+        manager.seed(wallet.get_address(), "0x1", 2)
+        transaction_payload = {
+            "chainId": "0x1",
+            "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+            "value": 0,
+            "gas": "0x5d6a",
+            "gasPrice": "0x3b9aca00",
+            "data": "0xdb7eff7c00000000",
+        }
+        signature = wallet.sign_transaction(transaction_payload)
+        self.assertEqual(signature["nonce"], 2)
+        self.assertEqual(
+            signature["hash"],
+            "0x616452f0874117edf0bf0c2f39f13d16a83748814f681efdc573431fc5088fb6",
+        )
+        # a failed signature hands the nonce back
+        with pytest.raises(SimbaTransactionException):
+            wallet.sign_transaction({"chainId": "0x1"})
+        self.assertEqual(manager.peek(wallet.get_address(), 1), 3)
+
+        signatures = wallet.sign_transactions(
+            [transaction_payload, {"chainId": "0x1"}, transaction_payload]
+        )
+        self.assertEqual(signatures[0]["nonce"], 3)
+        self.assertIsInstance(signatures[1], SimbaTransactionException)
+        self.assertEqual(signatures[2]["nonce"], 5)
+        self.assertEqual(manager.allocate(wallet.get_address(), 1), 4)
+
+    def test_wallet_batch_allocation_failures(self):
+        wallet = Wallet(nonce_manager=NonceManager())
+        wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+        payload = {
+            "chainId": "0x1",
+            "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+            "value": 0,
+            "gas": "0x5d6a",
+            "gasPrice": "0x3b9aca00",
+            "data": "0xdb7eff7c00000000",
+        }
+        for workers in (None, 2):
+            manager = wallet.nonce_manager = NonceManager()
+            manager.seed(wallet.get_address(), 1, 0)
+            signatures = wallet.sign_transactions(
+                [payload, payload, dict(payload, chainId="zz"), payload, 42], workers=workers
+            )
+            self.assertEqual([signatures[index]["nonce"] for index in (0, 1, 3)], [0, 1, 2])
+            self.assertIsInstance(signatures[2], SimbaTransactionException)
+            self.assertIsInstance(signatures[4], SimbaTransactionException)
+            self.assertEqual(manager.peek(wallet.get_address(), 1), 3)
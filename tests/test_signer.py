@@ -0,0 +1,179 @@
+import os
+import socket
+import tempfile
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from libsimba_utils.exceptions import (
+    SimbaMessageException,
+    SimbaSignerException,
+    SimbaTransactionException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.instrumentation import RecordingMetricsSink
+from libsimba_utils.signer import SignerClient, SignerServer
+from libsimba_utils.transaction import SignedTransaction
+from libsimba_utils.wallet import Wallet
+from libsimba_utils.wallet_pool import WalletPool
+
+
+PRIVATE_KEY = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+ADDRESS = "0xa8E070649A1D98651D281FdD428BD3EeC0d279e0"
+PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+}
+
+
+class TestSigner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "signer.sock")
+        self.wallet = Wallet()
+        self.wallet.generate_from_private_key(PRIVATE_KEY)
+        self.pool = WalletPool()
+        self.pool.add_private_key(PRIVATE_KEY)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_sign(self):
+        metrics = RecordingMetricsSink()
+        with SignerServer(self.path, self.pool, metrics=metrics):
+            with SignerClient(self.path) as client:
+                self.assertTrue(client.wallet_exists())
+                self.assertEqual(client.get_address(), ADDRESS)
+                payload = dict(PAYLOAD, nonce=3)
+                self.assertEqual(
+                    client.sign_transaction(payload), self.wallet.sign_transaction(payload)
+                )
+                signed = client.sign_transaction(payload, output="raw")
+                self.assertIsInstance(signed, SignedTransaction)
+                self.assertEqual(signed, self.wallet.sign_transaction(payload, output="raw"))
+                self.assertEqual(client.sign("hello"), self.wallet.sign("hello"))
+                self.assertEqual(client.sign(b"\x00\xff"), self.wallet.sign(b"\x00\xff"))
+                with pytest.raises(SimbaTransactionException) as exc:
+                    client.sign_transaction({"to": PAYLOAD["to"]})
+                self.assertIn("Missing field in transaction", str(exc))
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(metrics.count("signer.requests"), 5)
+
+    def test_batches(self):
+        payloads = [dict(PAYLOAD, nonce=nonce) for nonce in range(20)]
+        payloads[5] = {"to": PAYLOAD["to"]}
+        expected = self.wallet.sign_transactions(payloads)
+        for workers in (None, 2):
+            metrics = RecordingMetricsSink()
+            with SignerServer(
+                self.path, self.pool, workers=workers, batch_delay=0.05, metrics=metrics
+            ):
+                with SignerClient(self.path) as client:
+                    results = client.sign_transactions(payloads)
+                    messages = client.sign_messages(["hello", 42])
+            self.assertEqual(results[:5] + results[6:], expected[:5] + expected[6:])
+            self.assertIsInstance(results[5], SimbaTransactionException)
+            self.assertEqual(messages[0], self.wallet.sign("hello"))
+            self.assertIsInstance(messages[1], SimbaMessageException)
+            # pipelined requests are coalesced
+            self.assertEqual(metrics.count("signer.requests"), 22)
+            self.assertLess(metrics.count("signer.batches"), 22)
+
+    def test_concurrent_clients(self):
+        payloads = [dict(PAYLOAD, nonce=nonce) for nonce in range(8)]
+        with SignerServer(self.path, self.pool):
+
+            def sign(payload):
+                with SignerClient(self.path) as client:
+                    return client.sign_transaction(payload)
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(sign, payloads))
+        self.assertEqual(results, self.wallet.sign_transactions(payloads))
+
+    def test_identities(self):
+        other = Wallet()
+        other.generate_from_mnemonic()
+        self.pool.add_wallet(other)
+        with SignerServer(self.path, self.pool):
+            with SignerClient(self.path) as client:
+                self.assertFalse(client.wallet_exists())
+                with pytest.raises(SimbaWalletNotFoundException):
+                    client.sign("hello")
+            with SignerClient(self.path, address=other.get_address()) as client:
+                self.assertEqual(client.get_address(), other.get_address())
+                self.assertEqual(client.sign("hello"), other.sign("hello"))
+            with SignerClient(self.path, address="0x" + "00" * 20) as client:
+                self.assertFalse(client.wallet_exists())
+            with SignerClient(self.path, address="bogus") as client:
+                self.assertFalse(client.wallet_exists())
+
+    def test_stop_with_open_client(self):
+        client = SignerClient(self.path)
+        with SignerServer(self.path, self.pool):
+            self.assertEqual(client.get_address(), ADDRESS)
+        with pytest.raises(SimbaSignerException):
+            client.sign("hello")
+        with SignerServer(self.path, self.pool):
+            # reconnects after a failed request
+            self.assertEqual(client.sign("hello"), self.wallet.sign("hello"))
+        client.close()
+
+    def test_no_server(self):
+        with pytest.raises(SimbaSignerException) as exc:
+            SignerClient(self.path).sign("hello")
+        self.assertIn("Cannot connect to signer", str(exc))
+
+    def test_socket_path(self):
+        with SignerServer(self.path, self.pool):
+            self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+            # a running server is not taken over
+            with pytest.raises(SimbaSignerException) as exc:
+                SignerServer(self.path, self.pool).start()
+            self.assertIn("already serving", str(exc))
+            with SignerClient(self.path) as client:
+                self.assertEqual(client.sign("hello"), self.wallet.sign("hello"))
+        # a stale socket is replaced
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        with SignerServer(self.path, self.pool):
+            with SignerClient(self.path) as client:
+                self.assertEqual(client.get_address(), ADDRESS)
+        # anything else at the path is left alone
+        with open(self.path, "w") as other:
+            other.write("data")
+        with pytest.raises(SimbaSignerException) as exc:
+            SignerServer(self.path, self.pool).start()
+        self.assertIn("is not a socket", str(exc))
+        with open(self.path) as other:
+            self.assertEqual(other.read(), "data")
+
+    def test_nested_bytes(self):
+        typed_data = {
+            "types": {
+                "EIP712Domain": [
+                    {"name": "name", "type": "string"},
+                    {"name": "salt", "type": "bytes32"},
+                ],
+                "Record": [
+                    {"name": "data", "type": "bytes"},
+                    {"name": "hashes", "type": "bytes32[]"},
+                ],
+            },
+            "primaryType": "Record",
+            "domain": {"name": "Simba", "salt": b"\x01" * 32},
+            "message": {"data": b"\x00\xff", "hashes": [bytearray(b"\x02" * 32)]},
+        }
+        with SignerServer(self.path, self.pool):
+            with SignerClient(self.path) as client:
+                self.assertEqual(client.sign(typed_data), self.wallet.sign(typed_data))
+                messages = client.sign_messages([{"message": object()}, "hello"])
+        self.assertIsInstance(messages[0], SimbaSignerException)
+        self.assertEqual(messages[1], self.wallet.sign("hello"))
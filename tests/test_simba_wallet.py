@@ -51,6 +51,37 @@ class TestWallet(unittest.TestCase):
         wallet.delete_wallet()
         self.assertIsNone(wallet.wallet)
 
+    def test_signing_key_cached(self):
+        wallet = Wallet()
+        private_key = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        wallet.generate_from_private_key(private_key)
+        signing_key = wallet._get_signing_key()
+        self.assertEqual(signing_key.to_hex(), f"0x{private_key}")
+        self.assertIs(wallet._get_signing_key(), signing_key)
+        wallet.delete_wallet()
+        self.assertIsNone(wallet._signing_key)
+
+    def test_signing_key_follows_assigned_wallet(self):
+        from libsimba_utils.decoder import decode_transaction
+
+        wallet_a = Wallet()
+        wallet_a.generate_from_private_key("1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67")
+        wallet_a._get_signing_key()
+        wallet_b = Wallet()
+        wallet_b.generate_from_mnemonic()
+        wallet_a.wallet = wallet_b.wallet
+        self.assertIsNone(wallet_a._signing_key)
+        transaction_payload = {
+            "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+            "value": 0,
+            "gas": "0x5d6a",
+            "gasPrice": "0x3b9aca00",
+            "data": "0xdb7eff7c00000000",
+            "nonce": "0x2",
+        }
+        signed = wallet_a.sign_transaction(transaction_payload)
+        self.assertEqual(decode_transaction(signed["rawTransaction"])["from"], wallet_b.get_address())
+
     def test_delete_no_wallet(self):
         wallet = Wallet()
         wallet.delete_wallet()
@@ -161,3 +192,58 @@ class TestWallet(unittest.TestCase):
         with pytest.raises(SimbaWalletNotFoundException) as exc:
             wallet.get_address()
         self.assertIn("No wallet loaded!", str(exc))
+
+    def test_wallet_sign_transactions(self):
+        wallet = Wallet()
+        private_key = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        wallet.generate_from_private_key(private_key)
+        payloads = [
+            {
+                "chainId": "0x1",
+                "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+                "value": 0,
+                "gas": "0x5d6a",
+                "gasPrice": "0x3b9aca00",
+                "data": "0xdb7eff7c00000000",
+                "nonce": hex(nonce),
+            }
+            for nonce in range(4)
+        ]
+        payloads[1] = {"to": "0xdea35e452b7367c43330e0065ec22538f545333b"}
+        expected = [wallet.sign_transaction(payloads[i]) for i in (0, 2, 3)]
+        for workers in (None, 2):
+            signatures = wallet.sign_transactions(payloads, workers=workers)
+            self.assertEqual(len(signatures), 4)
+            self.assertEqual([signatures[i] for i in (0, 2, 3)], expected)
+            self.assertIsInstance(signatures[1], SimbaTransactionException)
+            self.assertIn("Missing field in transaction: 'gas'", str(signatures[1]))
+
+    def test_wallet_sign_transactions_invalid_values(self):
+        wallet = Wallet()
+        private_key = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        wallet.generate_from_private_key(private_key)
+        payload = {
+            "chainId": "0x1",
+            "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+            "value": 0,
+            "gas": "0x5d6a",
+            "gasPrice": "0x3b9aca00",
+            "data": "0xdb7eff7c00000000",
+            "nonce": "0x2",
+        }
+        invalid = [dict(payload, nonce=-1), dict(payload, nonce="0x"), dict(payload, gas=-5)]
+        for transaction_payload in invalid:
+            with pytest.raises(SimbaTransactionException) as exc:
+                wallet.sign_transaction(transaction_payload)
+            self.assertIn("Invalid transaction provided", str(exc))
+        for workers in (None, 2):
+            signatures = wallet.sign_transactions([payload] + invalid, workers=workers)
+            self.assertEqual(signatures[0], wallet.sign_transaction(payload))
+            for signature in signatures[1:]:
+                self.assertIsInstance(signature, SimbaTransactionException)
+
+    def test_wallet_sign_transactions_no_wallet(self):
+        wallet = Wallet()
+        with pytest.raises(SimbaWalletNotFoundException) as exc:
+            wallet.sign_transactions([{}])
+        self.assertIn("No wallet loaded!", str(exc))
@@ -0,0 +1,173 @@
+import pickle
+import unittest
+
+import pytest
+
+from libsimba_utils.exceptions import (
+    SimbaTransactionException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.transaction import (
+    SignedTransaction,
+    rlp_encode_bytes,
+    rlp_encode_int,
+    rlp_encode_list,
+)
+from libsimba_utils.wallet import Wallet
+
+
+LEGACY_PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+}
+EIP1559_PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "maxPriorityFeePerGas": "0x3b9aca00",
+    "maxFeePerGas": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+}
+
+
+class TestPreparedTransaction(unittest.TestCase):
+    def setUp(self):
+        self.wallet = Wallet()
+        self.wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+
+    def test_rlp(self):
+        import rlp
+
+        for value in (0, 1, 127, 128, 255, 1024, 2**256 - 1):
+            self.assertEqual(rlp_encode_int(value), rlp.encode(value))
+        for value in (b"", b"\x00", b"\x7f", b"\x80", b"a" * 55, b"a" * 56, b"a" * 1024):
+            self.assertEqual(rlp_encode_bytes(value), rlp.encode(value))
+        items = [b"a" * 30, b"b" * 30]
+        self.assertEqual(
+            rlp_encode_list(b"".join(rlp_encode_bytes(item) for item in items)),
+            rlp.encode(items),
+        )
+
+    def test_matches_sign_transaction(self):
+        for template in (
+            LEGACY_PAYLOAD,
+            EIP1559_PAYLOAD,
+            {key: value for key, value in LEGACY_PAYLOAD.items() if key != "chainId"},
+            dict(LEGACY_PAYLOAD, chainId=1337, value="0xde0b6b3a7640000"),
+            dict(EIP1559_PAYLOAD, data="0x" + "ab" * 300),
+            # contract creation
+            dict(LEGACY_PAYLOAD, to="0x"),
+            dict(EIP1559_PAYLOAD, to="0x"),
+        ):
+            prepared = self.wallet.prepare_transaction(template)
+            for nonce in (0, 2, "0x3", 1000):
+                self.assertEqual(
+                    prepared.sign(nonce),
+                    self.wallet.sign_transaction(dict(template, nonce=nonce)),
+                )
+
+    def test_expected_signature(self):
+        signature = self.wallet.prepare_transaction(LEGACY_PAYLOAD).sign(2)
+        self.assertEqual(
+            signature["hash"],
+            "0x616452f0874117edf0bf0c2f39f13d16a83748814f681efdc573431fc5088fb6",
+        )
+
+    def test_overrides(self):
+        prepared = self.wallet.prepare_transaction(EIP1559_PAYLOAD)
+        suffix = "00" * 31 + "2a"
+        self.assertEqual(
+            prepared.sign(5, data_suffix=suffix, value=7),
+            self.wallet.sign_transaction(
+                dict(EIP1559_PAYLOAD, nonce=5, value=7, data=EIP1559_PAYLOAD["data"] + suffix)
+            ),
+        )
+        self.assertEqual(
+            prepared.sign(5, data=b"\x01\x02"),
+            self.wallet.sign_transaction(dict(EIP1559_PAYLOAD, nonce=5, data="0x0102")),
+        )
+        # the template is unchanged
+        self.assertEqual(
+            prepared.sign(5), self.wallet.sign_transaction(dict(EIP1559_PAYLOAD, nonce=5))
+        )
+
+    def test_invalid(self):
+        with pytest.raises(SimbaTransactionException) as exc:
+            self.wallet.prepare_transaction({"to": LEGACY_PAYLOAD["to"]})
+        self.assertIn("Missing field in transaction: 'gas'", str(exc))
+        with pytest.raises(SimbaTransactionException) as exc:
+            self.wallet.prepare_transaction(dict(LEGACY_PAYLOAD, to="0xdea35e452b"))
+        self.assertIn("Invalid value for to", str(exc))
+        with pytest.raises(SimbaTransactionException) as exc:
+            self.wallet.prepare_transaction(dict(LEGACY_PAYLOAD, gas="0xzz"))
+        self.assertIn("Invalid value for gas", str(exc))
+        prepared = self.wallet.prepare_transaction(LEGACY_PAYLOAD)
+        with pytest.raises(SimbaTransactionException):
+            prepared.sign(-1)
+
+    def test_unprefixed_strings_rejected(self):
+        for field, value in (("value", "10"), ("chainId", "1"), ("gas", "5d6a")):
+            template = dict(LEGACY_PAYLOAD, **{field: value})
+            with pytest.raises(SimbaTransactionException):
+                self.wallet.sign_transaction(dict(template, nonce=1))
+            with pytest.raises(SimbaTransactionException) as exc:
+                self.wallet.prepare_transaction(template)
+            self.assertIn(f"Invalid value for {field}", str(exc))
+        prepared = self.wallet.prepare_transaction(LEGACY_PAYLOAD)
+        with pytest.raises(SimbaTransactionException):
+            prepared.sign("2")
+        self.assertEqual(
+            prepared.sign(2, value="0X10"),
+            self.wallet.sign_transaction(dict(LEGACY_PAYLOAD, nonce=2, value=16)),
+        )
+
+    def test_no_wallet(self):
+        with pytest.raises(SimbaWalletNotFoundException):
+            Wallet().prepare_transaction(LEGACY_PAYLOAD)
+
+
+class TestSignedTransaction(unittest.TestCase):
+    def setUp(self):
+        self.wallet = Wallet()
+        self.wallet.generate_from_private_key(
+            "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+        )
+
+    def test_raw_output(self):
+        payload = dict(LEGACY_PAYLOAD, nonce=2)
+        expected = self.wallet.sign_transaction(payload)
+        signed = self.wallet.sign_transaction(payload, output="raw")
+        self.assertIsInstance(signed, SignedTransaction)
+        self.assertIsInstance(signed.raw_transaction, bytes)
+        self.assertEqual(signed.raw_transaction, bytes.fromhex(expected["rawTransaction"][2:]))
+        self.assertEqual(signed.hash, bytes.fromhex(expected["hash"][2:]))
+        self.assertEqual(signed.hash_hex, expected["hash"])
+        self.assertEqual(signed.to_dict(), expected)
+        self.assertEqual(
+            self.wallet.prepare_transaction(LEGACY_PAYLOAD).sign(2, output="raw"), signed
+        )
+
+    def test_raw_output_batch(self):
+        payloads = [dict(EIP1559_PAYLOAD, nonce=nonce) for nonce in range(3)]
+        expected = self.wallet.sign_transactions(payloads)
+        for workers in (None, 2):
+            signed = self.wallet.sign_transactions(payloads, workers=workers, output="raw")
+            self.assertEqual([item.to_dict() for item in signed], expected)
+
+    def test_pickle(self):
+        signed = self.wallet.sign_transaction(dict(LEGACY_PAYLOAD, nonce=2), output="raw")
+        signed.nonce = 2
+        restored = pickle.loads(pickle.dumps(signed))
+        self.assertEqual(restored, signed)
+        self.assertEqual(restored.to_dict(), signed.to_dict())
+
+    def test_invalid_output(self):
+        with pytest.raises(ValueError):
+            self.wallet.sign_transaction(dict(LEGACY_PAYLOAD, nonce=2), output="hex")
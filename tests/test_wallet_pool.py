@@ -0,0 +1,108 @@
+import unittest
+
+import pytest
+
+from libsimba_utils.derivation import AccountDeriver
+from libsimba_utils.exceptions import (
+    SimbaPrivateKeyException,
+    SimbaWalletNotFoundException,
+)
+from libsimba_utils.wallet import Wallet
+from libsimba_utils.wallet_pool import WalletPool
+
+
+PRIVATE_KEY = "1837c1be8e2995ec11cda2b066151be2cfb48adf9e47b151d46adab3a21cdf67"
+ADDRESS = "0xa8E070649A1D98651D281FdD428BD3EeC0d279e0"
+PAYLOAD = {
+    "chainId": "0x1",
+    "to": "0xdea35e452b7367c43330e0065ec22538f545333b",
+    "value": 0,
+    "gas": "0x5d6a",
+    "gasPrice": "0x3b9aca00",
+    "data": "0xdb7eff7c00000000",
+    "nonce": "0x2",
+}
+
+
+class TestWalletPool(unittest.TestCase):
+    def setUp(self):
+        mnemonic = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+        self.accounts = AccountDeriver(mnemonic).accounts(count=5)
+
+    def test_add_and_sign(self):
+        pool = WalletPool(key_cache_size=2)
+        self.assertEqual(pool.add_private_key(PRIVATE_KEY), ADDRESS)
+        self.assertEqual(pool.add_private_key(f"0x{PRIVATE_KEY}"), ADDRESS)
+        pool.add_private_keys(account.private_key for account in self.accounts)
+        self.assertEqual(len(pool), 6)
+        self.assertIn(ADDRESS.lower(), pool)
+        self.assertEqual(
+            list(pool.addresses()), [ADDRESS] + [account.address for account in self.accounts]
+        )
+
+        wallet = Wallet()
+        wallet.generate_from_private_key(PRIVATE_KEY)
+        self.assertEqual(pool.sign_transaction(ADDRESS, PAYLOAD), wallet.sign_transaction(PAYLOAD))
+        for account in self.accounts:
+            wallet.generate_from_private_key(account.private_key)
+            self.assertEqual(
+                pool.sign_transaction(account.address, PAYLOAD),
+                wallet.sign_transaction(PAYLOAD),
+            )
+
+    def test_sign_message(self):
+        pool = WalletPool()
+        pool.add_private_key(PRIVATE_KEY)
+        wallet = Wallet()
+        wallet.generate_from_private_key(PRIVATE_KEY)
+        self.assertEqual(pool.sign(ADDRESS, "hello"), wallet.sign("hello"))
+        with pytest.raises(SimbaWalletNotFoundException):
+            pool.sign(self.accounts[0].address, "hello")
+
+    def test_remove(self):
+        pool = WalletPool()
+        pool.add_private_keys(account.private_key for account in self.accounts)
+        pool.remove(self.accounts[1].address)
+        self.assertNotIn(self.accounts[1].address, pool)
+        self.assertEqual(len(pool), 4)
+        # the last identity moved into the freed slot
+        self.assertEqual(
+            list(pool.addresses()),
+            [self.accounts[i].address for i in (0, 4, 2, 3)],
+        )
+        wallet = Wallet()
+        wallet.generate_from_private_key(self.accounts[4].private_key)
+        self.assertEqual(
+            pool.sign_transaction(self.accounts[4].address, PAYLOAD),
+            wallet.sign_transaction(PAYLOAD),
+        )
+        with pytest.raises(SimbaWalletNotFoundException) as exc:
+            pool.sign_transaction(self.accounts[1].address, PAYLOAD)
+        self.assertIn("No wallet for address", str(exc))
+
+    def test_add_wallet(self):
+        pool = WalletPool()
+        wallet = Wallet()
+        wallet.generate_from_private_key(PRIVATE_KEY)
+        self.assertEqual(pool.add_wallet(wallet), ADDRESS)
+
+    def test_invalid_address(self):
+        pool = WalletPool()
+        pool.add_private_key(PRIVATE_KEY)
+        for address in ("bogus", "0xzz", None):
+            self.assertNotIn(address, pool)
+            with pytest.raises(SimbaWalletNotFoundException) as exc:
+                pool.sign(address, "hello")
+            self.assertIn("No wallet for address", str(exc))
+            with pytest.raises(SimbaWalletNotFoundException):
+                pool.sign_transaction(address, PAYLOAD)
+            with pytest.raises(SimbaWalletNotFoundException):
+                pool.remove(address)
+        self.assertEqual(len(pool), 1)
+
+    def test_invalid_private_key(self):
+        pool = WalletPool()
+        for private_key in ("invalid", "1837c1be", bytes(32)):
+            with pytest.raises(SimbaPrivateKeyException):
+                pool.add_private_key(private_key)
+        self.assertEqual(len(pool), 0)